@@ -56,7 +56,8 @@ class Analyzer(AnalyzerScheme):
                 partial_search_factor=analysis_config.PARTIAL_SEARCH_FACTOR,
                 find_limit=analysis_config.ANALYZE_LIMIT,
                 find_gcd_slope=analysis_config.ANALYZE_GCD_SLOPE,
-                find_eigen_values=analysis_config.ANALYZE_EIGEN_VALUES
+                find_eigen_values=analysis_config.ANALYZE_EIGEN_VALUES,
+                depths=analysis_config.WALK_DEPTHS
             )
 
             identified = dm.identified_percentage
@@ -98,7 +99,10 @@ class Analyzer(AnalyzerScheme):
 
         ranked = {}
         for shard, dm in managers.items():
-            best_delta = dm.best_delta[0]
+            # shallow walks are ranked by their confident delta estimates, falling back to all of them
+            best_delta = dm.best_confident_delta(analysis_config.MIN_DELTA_CONFIDENCE)[0]
+            if best_delta is None:
+                best_delta = dm.best_delta[0]
             if best_delta is None:
                 continue
             ranked[shard] = {
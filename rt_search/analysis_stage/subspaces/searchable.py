@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+import numpy as np
 
 from rt_search.analysis_stage.subspaces.trajectory_generator import TrajectoryGenerator
 from rt_search.utils.types import *
@@ -24,6 +25,10 @@ class Searchable(ABC):
     def trajectory_in_space(self, start: Position, trajectory: Position) -> bool:
         raise NotImplementedError
 
+    @abstractmethod
+    def trajectories_in_space(self, start: Position, trajectories: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
     @abstractmethod
     def add_start_points(self, start_points: List[Position] | Position, filtering=True) -> None:
         raise NotImplementedError
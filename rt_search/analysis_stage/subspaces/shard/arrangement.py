@@ -0,0 +1,230 @@
+from rt_search.utils.types import *
+from rt_search.utils.geometry.plane import Plane
+from rt_search.utils.geometry.plane_set import PlaneSet
+from rt_search.configs import (
+    sys_config,
+    analysis_config
+)
+
+from scipy.optimize import linprog, milp, LinearConstraint, Bounds
+from itertools import product
+import numpy as np
+from tqdm import tqdm
+
+
+class HyperplaneArrangement:
+    """
+    A numeric representation of the CMF hyperplanes used for enumerating the cells (shards) of the arrangement. \n
+    Each hyperplane i is stored as a row a_i and a constant c_i such that the plane is a_i·x + c_i = 0.
+    A cell is identified by a +-1's vector s and contains the points x for which s_i * (a_i·x + c_i) >= err.
+    """
+
+    def __init__(self, hps: List[Plane], symbols: List[sp.Symbol], err: Optional[float] = None):
+        """
+        :param hps: The hyperplanes forming the arrangement
+        :param symbols: The symbols used in the hyperplanes' expressions (defines the coordinates order)
+        :param err: Safety margin from the hyperplanes, defaults to analysis_config.SHARD_EXTRACTOR_ERR
+        """
+        self.symbols = symbols
+        self.dim = len(symbols)
+        self.err = analysis_config.SHARD_EXTRACTOR_ERR if err is None else err
+        planes = PlaneSet(hps, symbols)
+        self.coeffs = planes.normals.astype(float)
+        self.consts = planes.offsets.astype(float)
+
+    def __len__(self):
+        return len(self.consts)
+
+    def values(self, point: np.ndarray, planes: Optional[List[int] | slice] = None) -> np.ndarray:
+        """
+        Evaluate the hyperplanes' expressions at a point
+        :param point: The point as an array of coordinates
+        :param planes: Evaluate only the hyperplanes in these indices
+        :return: The values a_i·x + c_i
+        """
+        planes = slice(None) if planes is None else planes
+        return self.coeffs[planes] @ point + self.consts[planes]
+
+    def find_point(self, shard: ShardVec) -> Optional[np.ndarray]:
+        """
+        Find a point inside the cell described by the shard vector. \n
+        If the shard vector is shorter than the number of hyperplanes, only the first len(shard) hyperplanes are
+        considered (i.e. the shard vector is a prefix).
+        The point is chosen such that its distance in values from the hyperplanes is as large as possible (up to 1),
+        so it is likely to be reused when splitting the cell further.
+        :param shard: A +-1's (partial) shard vector
+        :return: A point inside the cell if the cell is not empty, else None
+        """
+        k = len(shard)
+        if k == 0:
+            return np.zeros(self.dim)
+
+        signs = np.array(shard, dtype=float)
+        # s_i * (a_i·x + c_i) >= err + t  ⇔  -s_i * a_i·x + t <= s_i * c_i - err
+        A = np.hstack([-signs[:, None] * self.coeffs[:k], np.ones((k, 1))])
+        b = signs * self.consts[:k] - self.err
+        c = np.zeros(self.dim + 1)
+        c[-1] = -1
+        bounds = [(None, None)] * self.dim + [(None, 1)]
+        res = linprog(c=c, A_ub=A, b_ub=b, bounds=bounds, method='highs')
+
+        if res.status != 0 or res.x[-1] < 0:
+            return None
+        return res.x[:-1]
+
+    def split_cell(self, shard: ShardVec, point: np.ndarray) -> List[Tuple[ShardVec, np.ndarray]]:
+        """
+        Split a cell by the next hyperplane (the hyperplane in index len(shard)).
+        The known point of the cell is reused by the side it is in, so at most one LP is solved unless the point is
+        too close to the new hyperplane.
+        :param shard: A +-1's shard vector prefix of the cell
+        :param point: A point inside the cell
+        :return: A list of the non-empty child cells and a point inside each of them
+        """
+        value = self.values(point, [len(shard)])[0]
+        children = []
+        for sign in (+1, -1):
+            child = shard + (sign,)
+            if sign * value >= self.err:
+                children.append((child, point))
+            elif (child_point := self.find_point(child)) is not None:
+                children.append((child, child_point))
+        return children
+
+    def expand_frontier(self, min_cells: int) -> List[Tuple[ShardVec, np.ndarray]]:
+        """
+        Split the cells breadth first until there are at least min_cells partial cells (or all hyperplanes were added).
+        :param min_cells: The minimal number of cells required
+        :return: A list of partial shard vectors (all of the same length) and a point inside each of them
+        """
+        cells = [(tuple(), np.zeros(self.dim))]
+        while len(cells) < min_cells and len(cells[0][0]) < len(self):
+            cells = [child for shard, point in cells for child in self.split_cell(shard, point)]
+        return cells
+
+    def enumerate_subtree(self, shard: ShardVec, point: np.ndarray) -> List[Tuple[ShardVec, List[float]]]:
+        """
+        Enumerate depth first all the non-empty cells whose shard vector starts with the given prefix.
+        An empty prefix prunes its whole subtree, and each child reuses its parent's point when possible.
+        :param shard: A +-1's shard vector prefix
+        :param point: A point inside the cell of the prefix
+        :return: A list of the shard vectors and a point inside each of the cells, ordered as in
+            itertools.product([+1, -1], repeat=k)
+        """
+        if len(shard) == len(self):
+            return [(shard, point.tolist())]
+        return [cell for child in self.split_cell(shard, point) for cell in self.enumerate_subtree(*child)]
+
+    def enumerate_cells(self, show_progress: bool = True) -> List[Tuple[ShardVec, List[float]]]:
+        """
+        Enumerate all the non-empty cells of the arrangement by adding the hyperplanes one at a time and splitting only
+        the cells that a new hyperplane crosses.
+        The number of LPs solved is bounded by the number of cells created along the way instead of 2^k.
+        :param show_progress: Show a progress bar over the hyperplanes added
+        :return: A list of the shard vectors and a point inside each of the cells, ordered as in
+            itertools.product([+1, -1], repeat=k)
+        """
+        cells = [(tuple(), np.zeros(self.dim))]
+        planes = range(len(self))
+        if show_progress:
+            planes = tqdm(planes, desc='Computing shards', **sys_config.TQDM_CONFIG)
+        for _ in planes:
+            cells = [child for shard, point in cells for child in self.split_cell(shard, point)]
+        cells.sort(key=lambda cell: tuple(-s for s in cell[0]))
+        return [(shard, point.tolist()) for shard, point in cells]
+
+    def chebyshev_center(self, shard: ShardVec, max_radius: float) -> Optional[Tuple[np.ndarray, float]]:
+        """
+        Find the Chebyshev center of a cell - the center of the largest ball (of radius up to max_radius) inside it. \n
+        Unbounded cells have many such centers, so a second LP picks the one closest to the origin (in L1 norm).
+        :param shard: A +-1's shard vector
+        :param max_radius: The maximal radius of the ball
+        :return: The center and the radius if the cell is not empty, else None
+        """
+        if len(self) == 0:
+            return np.zeros(self.dim), max_radius
+
+        signs = np.array(shard, dtype=float)
+        norms = np.linalg.norm(self.coeffs, axis=1)
+        # s_i * (a_i·x + c_i) >= err + r * ||a_i||  ⇔  -s_i * a_i·x + ||a_i|| * r <= s_i * c_i - err
+        A = -signs[:, None] * self.coeffs
+        b = signs * self.consts - self.err
+        c = np.zeros(self.dim + 1)
+        c[-1] = -1
+        bounds = [(None, None)] * self.dim + [(0, max_radius)]
+        res = linprog(c=c, A_ub=np.hstack([A, norms[:, None]]), b_ub=b, bounds=bounds, method='highs')
+        if res.status != 0:
+            return None
+        center, radius = res.x[:-1], res.x[-1] * (1 - 1e-6)
+
+        # x = u - v with u, v >= 0, minimize sum(u + v) while keeping the ball inside the cell
+        res = linprog(
+            c=np.ones(2 * self.dim), A_ub=np.hstack([A, -A]), b_ub=b - norms * radius, bounds=(0, None), method='highs'
+        )
+        if res.status == 0:
+            center = res.x[:self.dim] - res.x[self.dim:]
+        return center, radius
+
+    def contains(self, shard: ShardVec, points: np.ndarray, tol: float) -> np.ndarray:
+        """
+        Check which points are strictly inside a cell
+        :param shard: A +-1's shard vector
+        :param points: An (N, d) array of points
+        :param tol: Points closer (in value) than this to a hyperplane are not considered inside the cell
+        :return: A boolean mask of length N
+        """
+        values = np.asarray(points) @ self.coeffs.T + self.consts
+        return np.all(np.array(shard) * values > tol, axis=1)
+
+    def lattice_points(self, shard: ShardVec, shift: np.ndarray, tol: float) -> np.ndarray:
+        """
+        Find lattice points (shifted by shift) inside a cell. \n
+        The lattice points around the Chebyshev center of the cell are tried first - if the inscribed ball has a radius
+        larger than sqrt(d)/2, the nearest one of them is guaranteed to be inside the cell. Otherwise (thin cells), an
+        integer program is solved for the lattice point inside the cell which is closest to the origin.
+        :param shard: A +-1's shard vector
+        :param shift: The shift of the lattice
+        :param tol: Points closer (in value) than this to a hyperplane are not considered inside the cell
+        :return: A (N, d) integer array of the lattice points z such that z + shift is inside the cell
+            (N = 0 if there are none)
+        """
+        found = self.chebyshev_center(shard, np.sqrt(self.dim) / 2 + 1)
+        if found is None:
+            return np.zeros((0, self.dim), dtype=np.int64)
+
+        center, _ = found
+        candidates = np.floor(center - shift) + np.array(list(product([0, 1], repeat=self.dim)))
+        inside = candidates[self.contains(shard, candidates + shift, tol)]
+        if len(inside) > 0 or len(self) == 0:
+            return inside.astype(np.int64)
+
+        point = self.__closest_lattice_point(shard, shift, tol)
+        return np.zeros((0, self.dim), dtype=np.int64) if point is None else point[None, :]
+
+    def __closest_lattice_point(self, shard: ShardVec, shift: np.ndarray, tol: float) -> Optional[np.ndarray]:
+        """
+        Solve min ||z||_1 s.t. z is an integer vector and z + shift is inside the cell
+        :param shard: A +-1's shard vector
+        :param shift: The shift of the lattice
+        :param tol: Points closer (in value) than this to a hyperplane are not considered inside the cell
+        :return: The lattice point z if exists, else None
+        """
+        signs = np.array(shard, dtype=float)
+        eye = np.eye(self.dim)
+        # variables are (z, w) with w >= |z|
+        constraints = [
+            LinearConstraint(
+                np.hstack([signs[:, None] * self.coeffs, np.zeros((len(self), self.dim))]),
+                lb=2 * tol - signs * (self.coeffs @ shift + self.consts)
+            ),
+            LinearConstraint(np.hstack([eye, -eye]), ub=0),
+            LinearConstraint(np.hstack([-eye, -eye]), ub=0)
+        ]
+        c = np.concatenate([np.zeros(self.dim), np.ones(self.dim)])
+        integrality = np.concatenate([np.ones(self.dim), np.zeros(self.dim)])
+        res = milp(c=c, constraints=constraints, integrality=integrality, bounds=Bounds(-np.inf, np.inf))
+        if res.status != 0 or res.x is None:
+            return None
+
+        point = np.round(res.x[:self.dim])
+        return point.astype(np.int64) if self.contains(shard, (point + shift)[None, :], tol)[0] else None
@@ -1,4 +1,5 @@
 from typing import TYPE_CHECKING
+import numpy as np
 
 from ..searchable import Searchable
 from rt_search.utils.types import *
@@ -18,16 +19,22 @@ class Shard(Searchable):
     def __init__(self,
                  shard_id: ShardVec,
                  extractor: "ShardExtractor",
-                 tg: Optional[TrajectoryGenerator] = None):
+                 tg: Optional[TrajectoryGenerator] = None,
+                 facets: Optional[List[int]] = None):
         """
         :param shard_id: A +-1's vector. Each index corresponds to a hyperplane,
         representing if all the points in the shard are above the hyperplane or blow it (+1 = above, -1 = below).
         :param extractor: The ShardExtractor instance that created this Shard.
+        :param facets: The indices of the hyperplanes bounding the Shard (defaults to all of them)
         """
         super().__init__(extractor.const_name, len(extractor.symbols), extractor.cmf, extractor.symbols, tg)
         self.hps = extractor.hps
+        self.plane_set = extractor.plane_set
         self.shard_id = shard_id
         self.extractor = extractor
+        self.facets = list(range(len(shard_id))) if facets is None else facets
+        self.facet_set = self.plane_set.subset(self.facets)
+        self.facet_signs = np.array([shard_id[i] for i in self.facets], dtype=np.int8)
 
     def __eq__(self, other: object) -> bool:
         """
@@ -55,21 +62,43 @@ class Shard(Searchable):
 
     def in_space(self, point: Position) -> Tuple[bool, ShardVec]:
         """
-        Checks if a point is within the Shard's borders.
+        Checks if a point is within the Shard's borders (only the facets are checked).
         :param point: A tuple representing a coordinate in the lattice
-        :return: True if the point is within the shard, else False.
+        :return: True if the point is within the shard, else False. The encoding of the point's shard.
         """
-        encoded, valid = self.extractor.encode_point(point, self.hps)
+        if np.array_equal(self.facet_set.classify(self.facet_set.as_array(point)), self.facet_signs):
+            return True, self.shard_id
+        encoded, valid = self.plane_set.encode(point)
         return encoded == self.shard_id and valid, encoded
 
     def trajectory_in_space(self, trajectory: Position, start: Position) -> bool:
+        return bool(self.trajectories_in_space(start, self.plane_set.as_array(trajectory))[0])
+
+    def trajectories_in_space(self, start: Position, trajectories: np.ndarray) -> np.ndarray:
+        """
+        Checks for a set of trajectories if the rays from the start point along them never leave the Shard
+        (i.e. never cross one of its facets).
+        :param start: The start point of the rays
+        :param trajectories: An (N, d) array of trajectories (or a single trajectory of shape (d,))
+        :return: A boolean mask of length N - True if the trajectory stays in the Shard, else False.
+        """
+        trajectories = np.asarray(trajectories).reshape(-1, self.dim)
         if not self.in_space(start)[0]:
-            return False
-        for plane in self.hps:
-            d = plane.intersection_with_line_coeff(start, trajectory)
-            if d is not None and d >= -1e-4:    # keep safe distance
-                return False
-        return True
+            return np.zeros(len(trajectories), dtype=bool)
+
+        # the ray start + t * trajectory intersects the i-th hyperplane at t = -value_i(start) / (normal_i · trajectory)
+        values = self.facet_set.values(self.facet_set.as_array(start))
+        dots = trajectories @ self.facet_set.normals.T
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = -values / dots
+        crossing = (np.abs(dots) > 1e-10) & (t >= -1e-4)    # keep safe distance
+        return ~np.any(crossing, axis=1)
+
+    def neighbours(self) -> List["Shard"]:
+        """
+        :return: The Shards sharing a facet with this Shard
+        """
+        return self.extractor.get_neighbours(self)
 
     def add_start_points(self, start_points: List[Position] | Position, filtering=True) -> None:
         if isinstance(start_points, Position):
@@ -0,0 +1,126 @@
+from rt_search.utils.types import *
+from rt_search.utils.geometry.plane import Plane
+from rt_search.utils.IO import (
+    exports as exp,
+    imports as imp
+)
+from rt_search.configs import analysis_config
+
+from dataclasses import dataclass
+import hashlib
+import sqlite3
+import json
+
+
+@dataclass
+class ShardCacheEntry(exp.JSONExportable, imp.JSONImportable):
+    """
+    The shard extraction results of a single CMF with a specific shift.
+    The start points are only valid for the start point settings they were generated with (start_settings).
+    """
+    hps: List[Plane]
+    symbols: List[sp.Symbol]
+    encoded_shards: Optional[List[ShardVec]] = None
+    feasible_points: Optional[List[List[int | float]]] = None
+    start_points: Optional[Dict[ShardVec, List[Position]]] = None
+    start_settings: Optional[str] = None
+
+    def to_json_obj(self) -> dict:
+        return {
+            'symbols': [sp.srepr(sym) for sym in self.symbols],
+            'hps': [sp.srepr(plane.expression) for plane in self.hps],
+            'encoded_shards': [list(shard) for shard in self.encoded_shards] if self.encoded_shards is not None
+            else None,
+            'feasible_points': self.feasible_points,
+            'start_points': [
+                [list(shard), [[str(c) for c in point.values()] for point in points]]
+                for shard, points in self.start_points.items()
+            ] if self.start_points is not None else None,
+            'start_settings': self.start_settings
+        }
+
+    @classmethod
+    def from_json_obj(cls, src: dict) -> "ShardCacheEntry":
+        symbols = [sp.sympify(sym) for sym in src['symbols']]
+        start_points = None
+        if src['start_points'] is not None:
+            start_points = {
+                tuple(shard): [Position([sp.Rational(c) for c in point], symbols) for point in points]
+                for shard, points in src['start_points']
+            }
+        return cls(
+            hps=[Plane(sp.sympify(expr), symbols) for expr in src['hps']],
+            symbols=symbols,
+            encoded_shards=[tuple(shard) for shard in src['encoded_shards']] if src['encoded_shards'] is not None
+            else None,
+            feasible_points=src['feasible_points'],
+            start_points=start_points,
+            start_settings=src.get('start_settings')
+        )
+
+
+class ShardCache:
+    """
+    A persistent SQLite store of shard extraction results, keyed by a canonical hash of the CMF and the shift.
+    """
+    VERSION = 2     # bump whenever the extraction changes such that previously stored results are no longer valid
+
+    def __init__(self, path: str):
+        """
+        :param path: Path to the SQLite database file (created if it doesn't exist)
+        """
+        self.path = path
+        with sqlite3.connect(self.path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS shards (
+                    key TEXT PRIMARY KEY,
+                    version INTEGER,
+                    entry TEXT
+                )
+            """)
+
+    @staticmethod
+    def key(cmf: CMF, shift: Position) -> str:
+        """
+        Compute the canonical key of a CMF with a shift (and the settings the hyperplanes depend on)
+        :param cmf: The CMF
+        :param shift: The shift in start point
+        :return: The hex digest identifying the pair
+        """
+        obj = {
+            'cmf': cmf.to_json_obj(),
+            'shift': shift.to_json_obj(),
+            'err': analysis_config.SHARD_EXTRACTOR_ERR,
+            'known': analysis_config.USE_KNOWN_HYPERPLANES
+        }
+        return hashlib.sha256(json.dumps(obj, sort_keys=True).encode()).hexdigest()
+
+    def load(self, cmf: CMF, shift: Position) -> Optional[ShardCacheEntry]:
+        """
+        Retrieve the stored results for a CMF with a shift. Results stored by another version are discarded.
+        :param cmf: The CMF
+        :param shift: The shift in start point
+        :return: The stored entry if exists, else None
+        """
+        key = self.key(cmf, shift)
+        with sqlite3.connect(self.path) as conn:
+            row = conn.execute("SELECT version, entry FROM shards WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[0] != self.VERSION:
+                conn.execute("DELETE FROM shards WHERE key = ?", (key,))
+                return None
+        return ShardCacheEntry.from_json_obj(json.loads(row[1]))
+
+    def store(self, cmf: CMF, shift: Position, entry: ShardCacheEntry) -> None:
+        """
+        Store (or override) the results for a CMF with a shift
+        :param cmf: The CMF
+        :param shift: The shift in start point
+        :param entry: The results to store
+        """
+        with sqlite3.connect(self.path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO shards (key, version, entry) VALUES (?, ?, ?)",
+                (self.key(cmf, shift), self.VERSION, entry.to_json())
+            )
@@ -1,14 +1,19 @@
 from rt_search.utils.types import *
 from rt_search.utils.geometry.plane import Plane
+from rt_search.utils.geometry.plane_set import PlaneSet
 from rt_search.configs import (
     sys_config,
     analysis_config
 )
 
 from .shard import Shard
+from .arrangement import HyperplaneArrangement
+from .shard_cache import ShardCache, ShardCacheEntry
+from .singular_locus import singular_locus
 from rt_search.utils.geometry.point_generator import PointGenerator
 from rt_search.utils.logger import Logger
 from rt_search.utils.cmf import CMF
+from rt_search.utils.pool import PoolManager
 
 from itertools import product
 from functools import lru_cache, partial
@@ -16,7 +21,8 @@ from scipy.optimize import linprog
 import numpy as np
 from numpy import linalg
 from tqdm import tqdm
-from concurrent.futures import ProcessPoolExecutor
+import networkx as nx
+import json
 
 from ..trajectory_generator import TrajectoryGenerator
 
@@ -29,8 +35,14 @@ class ShardExtractor:
         self.const_name = const_name
         self.cmf: CMF = cmf
         self.shifts: Position = shifts
-        self.pool = ProcessPoolExecutor() if analysis_config.PARALLEL_SHARD_VALIDATION else None
-        self.hps, self.symbols = self.__extract_shard_hyperplanes(cmf)
+        self.cache = ShardCache(analysis_config.SHARD_CACHE_PATH) if analysis_config.USE_SHARD_CACHE else None
+        cached = self.cache.load(cmf, shifts) if self.cache else None
+        if cached is not None:
+            self.hps, self.symbols = cached.hps, cached.symbols
+            Logger(f'Loaded shards of this CMF from cache: {self.cache.path}', Logger.Levels.info).log(msg_prefix='\n')
+        else:
+            self.hps, self.symbols = self.__extract_shard_hyperplanes(cmf)
+        self.plane_set = PlaneSet(self.hps, self.symbols)
         Logger(
             f'\n* symbols for this CMF: {self.symbols}\n* Shifts: {self.shifts}', Logger.Levels.info
         ).log(msg_prefix='\n')
@@ -40,7 +52,28 @@ class ShardExtractor:
         self._encoded_shards = [tuple()] if self._mono_shard else None
         self._feasible_points = [[0] * len(self.symbols)] if self._mono_shard else None
         self._shards = [Shard(tuple(), self)] if self._mono_shard else None
+        self._graph: Optional[nx.Graph] = None
         self._populated = False
+        self._start_points: Optional[Dict[ShardVec, List[Position]]] = None
+        self._start_settings: Optional[str] = None
+
+        if cached is None:
+            self.__update_cache()
+        else:
+            if not self._mono_shard and cached.encoded_shards is not None:
+                self._encoded_shards, self._feasible_points = cached.encoded_shards, cached.feasible_points
+            self._start_points, self._start_settings = cached.start_points, cached.start_settings
+
+    def __update_cache(self) -> None:
+        """
+        Store the results computed so far in the shard cache (if caching is in use)
+        """
+        if self.cache is None:
+            return
+        self.cache.store(self.cmf, self.shifts, ShardCacheEntry(
+            self.hps, self.symbols, self._encoded_shards, self._feasible_points, self._start_points,
+            self._start_settings
+        ))
 
     def __eq__(self, other):
         if isinstance(other, ShardExtractor):
@@ -48,57 +81,29 @@ class ShardExtractor:
         raise NotImplementedError
 
     @staticmethod
-    def __proportional(expr1: sp.Expr, expr2: sp.Expr, symbols: List[sp.Symbol]) -> bool:
-        # Build full coefficient vectors including the constant term
-        coeffs1 = [expr1.coeff(s) for s in symbols] + [expr1.as_independent(*symbols, as_Add=True)[0]]
-        coeffs2 = [expr2.coeff(s) for s in symbols] + [expr2.as_independent(*symbols, as_Add=True)[0]]
-
-        v1, v2 = sp.Matrix(coeffs1), sp.Matrix(coeffs2)
-
-        # Handle zero vector corner cases
-        if v1.is_zero or v2.is_zero:
-            return v1.is_zero and v2.is_zero
-        return sp.Matrix.hstack(v1, v2).rank() == 1
+    def _check_linear_solutions(lhs, rhs, shift: Position) -> bool:
+        """
+        Checks if a hyperplane contains lattice points (with respect to the shift)
+        :param lhs: The left hand side of the hyperplane equation
+        :param rhs: The right hand side of the hyperplane equation
+        :param shift: The shift in start point
+        :return: True if the shifted hyperplane passes through integer points, else False
+        """
+        # TODO: deal with non-linear shards (add conversion to rational + multiply by lcm)
+        expr = lhs - rhs
+        expr = expr.subs({sym: sym + shift[sym] for sym in expr.free_symbols})
+        coeffs = [int(expr.diff(v)) for v in expr.free_symbols]
+        free = expr.subs({sym: 0 for sym in expr.free_symbols})
+        gcd = sp.gcd(coeffs) if coeffs else 0
+        if gcd == 0:
+            return free == 0
+        return sp.Abs(free) % gcd == 0
 
     @staticmethod
     def _clac_hyperplanes_worker(mat, shift: Position):
-        def check_linear_solutions(lhs, rhs) -> bool:
-            # TODO: deal with non-linear shards (add conversion to rational + multiply by lcm)
-            expr = lhs - rhs
-            expr = expr.subs({sym: sym + shift[sym] for sym in expr.free_symbols})
-            coeffs = [int(expr.diff(v)) for v in expr.free_symbols]
-            free = expr.subs({sym: 0 for sym in expr.free_symbols})
-            gcd = sp.gcd(coeffs) if coeffs else 0
-            if gcd == 0:
-                return free == 0
-            return sp.Abs(free) % gcd == 0
-
-        def __solve_shards(mat: sp.Matrix) -> Tuple[Set[EqTup], Set[EqTup]]:
-            """
-            Find the expressions for which the matrix is undefined or its determinant is 0
-            :param mat: The matrix to preform the calculations on
-            :return: The list of expressions for undefined hyperplanes (lhs, rhs);
-            The list of expressions for zero determinant hyperplanes (lhs, rhs)
-            """
-
-            def __transform(l: List[Dict]) -> Set[EqTup]:
-                """
-                Convert a list of dictionaries generated by sympy.solve() into a set of lhs, rhs tuples
-                :param l: The list of dictionaries to transform
-                :return: The transformed list
-                """
-                return set(tuple(set(sol.items()))[0] for sol in l)
-
-            l = []
-            for v in mat.iter_values():
-                if (den := v.as_numer_denom()[1]) == 1:
-                    continue
-                l += [{sym: sol} for sym in den.free_symbols for sol in sp.solve(den, sym)]
-            return __transform(l), __transform(sp.solve(mat.det()))
-
-        undef, z_det = __solve_shards(mat)
+        undef, z_det = singular_locus(sp.ImmutableMatrix(mat))
         combined = undef.union(z_det)
-        return {s for s in combined if check_linear_solutions(*s)}
+        return {s for s in combined if ShardExtractor._check_linear_solutions(*s, shift)}
 
     @staticmethod
     @lru_cache(maxsize=128 if analysis_config.USE_CACHING else 0)
@@ -148,25 +153,39 @@ class ShardExtractor:
             return True, x
         return False, []
 
+    @staticmethod
+    def _validate_subtree_worker(root: Tuple[ShardVec, np.ndarray],
+                                 arrangement: HyperplaneArrangement) -> List[Tuple[ShardVec, List[int | float]]]:
+        """
+        Finds depth first all the valid shards whose vectors start with a given prefix
+        :param root: A +-1's shard vector prefix and a feasible point of it
+        :param arrangement: The hyperplane arrangement of the CMF
+        :return: A list of the valid shard vectors in the subtree and a feasible point in each of them
+        """
+        return arrangement.enumerate_subtree(*root)
+
+    @staticmethod
+    def _lattice_points_worker(shard: ShardVec, arrangement: HyperplaneArrangement, shift: np.ndarray) -> np.ndarray:
+        """
+        Finds lattice points inside a shard
+        :param shard: The shard vector
+        :param arrangement: The hyperplane arrangement of the CMF
+        :param shift: The shift in start point as an array
+        :return: An (N, d) integer array of the lattice points (before shifting) inside the shard
+        """
+        return arrangement.lattice_points(shard, shift, PlaneSet.ON_PLANE_TOL)
+
     def __extract_shard_hyperplanes(self, cmf: CMF) -> Tuple[List[Plane], List[sp.Symbol]]:
         """
         Extract the CMF's hyperplanes that form the shards
         :param cmf: The CMF to analyze
         :return: the list of sympy expressions describing the hyperplanes and a list of the symbols
         """
-
-        def remove_duplicates(l: Set[EqTup]) -> List[EqTup]:
-            """
-            Converts the set of tuples (lhs, rhs) into a list of tuples such that we won't have doubles (filtering).
-            :param l: The list to "unfreeze"
-            :return: The filtered list of tuples (lhs, rhs)
-            """
-            clean = [set(tup) for tup in l]
-            new_lst = set(tuple(tup) for tup in clean)
-            return list(new_lst)  # type checker shouts, but this is correct!
-
-        if analysis_config.PARALLEL_SHARD_EXTRACTION:
-            results = self.pool.map(
+        known = cmf.known_singular_hyperplanes() if analysis_config.USE_KNOWN_HYPERPLANES else None
+        if known is not None:
+            data = {s for s in known if ShardExtractor._check_linear_solutions(*s, self.shifts)}
+        elif analysis_config.PARALLEL_SHARD_EXTRACTION:
+            results = PoolManager.map(
                 partial(ShardExtractor._clac_hyperplanes_worker, shift=self.shifts),
                 cmf.matrices.values(),
                 chunksize=analysis_config.HP_CALC_CHUNK
@@ -177,22 +196,14 @@ class ShardExtractor:
             for mat in cmf.matrices.values():
                 data = data.union(ShardExtractor._clac_hyperplanes_worker(mat, self.shifts))
 
-        data = remove_duplicates(data)
         symbols = list(cmf.matrices.keys())
-        planes = [Plane(exp1 - exp2, symbols) for exp1, exp2 in data]
-        filtered = [planes[-1]] if planes else []
-
-        # make sure planes are uniuqe
-        i = len(planes) - 2
-        while i >= 0:
-            append = True
-            for plane in filtered:
-                if ShardExtractor.__proportional(planes[i].expression, plane.expression, plane.symbols):
-                    append = False
-                    break
-            if append:
-                filtered.append(planes[i])
-            i -= 1
+
+        # make sure planes are unique - proportional planes share the same canonical coefficients
+        unique = dict()
+        for exp1, exp2 in data:
+            plane = Plane(exp1 - exp2, symbols).canonical()
+            unique.setdefault(plane.canonical_key, plane)
+        filtered = [unique[key] for key in sorted(unique)]
 
         if analysis_config.PRINT_SHARDS:
             hps = ''
@@ -214,10 +225,49 @@ class ShardExtractor:
             self._feasible_points = [[0] * len(self.symbols)]
             return self._encoded_shards
 
+        match analysis_config.SHARD_ENUMERATION:
+            case 'incremental':
+                shards_validated = HyperplaneArrangement(self.hps, self.symbols).enumerate_cells()
+            case 'dfs':
+                shards_validated = self.__validate_shards_dfs()
+            case 'exhaustive':
+                shards_validated = self.__validate_all_shards()
+            case _:
+                raise ValueError(
+                    f"Invalid shard enumeration method: {analysis_config.SHARD_ENUMERATION}, "
+                    f"method must be 'incremental' / 'dfs' / 'exhaustive'"
+                )
+
+        self._encoded_shards = [perm for perm, point in shards_validated]
+        self._feasible_points = [point for _, point in shards_validated]
+        self.__update_cache()
+        return self._encoded_shards
+
+    def __validate_shards_dfs(self) -> List[Tuple[ShardVec, List[int | float]]]:
+        """
+        Validate the shard vectors depth first, pruning every subtree whose prefix is already infeasible.
+        On parallel validation the tree is split into subtrees which are validated by the pool.
+        :return: A list of the valid shard vectors and a feasible point in each of them
+        """
+        arrangement = HyperplaneArrangement(self.hps, self.symbols)
+        if not analysis_config.PARALLEL_SHARD_VALIDATION:
+            return arrangement.enumerate_subtree(tuple(), np.zeros(len(self.symbols)))
+
+        roots = arrangement.expand_frontier(analysis_config.SHARD_DFS_SUBTREES)
+        subtrees = PoolManager.map(
+            partial(ShardExtractor._validate_subtree_worker, arrangement=arrangement), roots
+        )
+        return [shard for subtree in subtrees for shard in subtree]
+
+    def __validate_all_shards(self) -> List[Tuple[ShardVec, List[int | float]]]:
+        """
+        Validate every possible shard vector (2^k of them) using a single LP for each
+        :return: A list of the valid shard vectors and a feasible point in each of them
+        """
         perms = list(product([+1, -1], repeat=len(self.hps)))
 
         if analysis_config.PARALLEL_SHARD_VALIDATION:
-            vals = self.pool.map(
+            vals = PoolManager.map(
                 partial(ShardExtractor._validate_shard_worker, hps=self.hps, symbols=self.symbols),
                 perms,
                 chunksize=analysis_config.SHARD_VALIDATION_CHUNK
@@ -229,17 +279,49 @@ class ShardExtractor:
                 if (val := self._validate_shard_worker(perm, self.hps, self.symbols))[0]
             ]
         ShardExtractor.__expr_to_ineq.cache_clear()
-
-        self._encoded_shards = [perm for perm, point in shards_validated]
-        self._feasible_points = [point for _, point in shards_validated]
-        return self._encoded_shards
+        return shards_validated
 
     def get_shards(self) -> List[Shard]:
         tg = TrajectoryGenerator(self.symbols)
         if self._shards is None:
-            self._shards = [Shard(shard_id, self, tg) for shard_id in self.get_encoded_shards()]
+            graph = self.get_shard_graph()
+            self._shards = [
+                Shard(shard_id, self, tg, sorted(plane for *_, plane in graph.edges(shard_id, data='plane')))
+                for shard_id in self.get_encoded_shards()
+            ]
         return self._shards
 
+    def get_shard_graph(self) -> nx.Graph:
+        """
+        Compute the shards adjacency graph - two shards are adjacent iff they differ across a single facet. \n
+        Removing the constraint of hyperplane i from a shard leaves a region that hyperplane i intersects iff
+        hyperplane i is a facet of the shard (i.e. the constraint is irredundant), and then the shard with the i-th sign
+        flipped is not empty. Thus, the facets are found by looking up the flipped vectors among the enumerated shards
+        instead of solving a redundancy LP for each hyperplane.
+        :return: A graph whose nodes are the shard vectors, each edge is labeled by its facet's index ('plane')
+        """
+        if self._graph is not None:
+            return self._graph
+
+        encoded = self.get_encoded_shards()
+        keys = {sum(1 << i for i, s in enumerate(shard) if s == 1): shard for shard in encoded}
+        self._graph = nx.Graph()
+        self._graph.add_nodes_from(encoded)
+        for key, shard in keys.items():
+            for i in range(len(shard)):
+                flipped = key ^ (1 << i)
+                if flipped > key and flipped in keys:
+                    self._graph.add_edge(shard, keys[flipped], plane=i)
+        return self._graph
+
+    def get_neighbours(self, shard: Shard) -> List[Shard]:
+        """
+        :param shard: A shard of this CMF
+        :return: The shards sharing a facet with the given shard
+        """
+        shards = {s.shard_id: s for s in self.get_shards()}
+        return [shards[neighbour] for neighbour in self.get_shard_graph().neighbors(shard.shard_id)]
+
     def compute_feasible_points(self) -> Tuple[Dict[ShardVec, List[Position]], List[Position]]:
         shards = self.get_shards()
         point_classification = {shard_id: [] for shard_id in self._encoded_shards}
@@ -257,11 +339,13 @@ class ShardExtractor:
                                   use_feasible: bool = True,
                                   expand_anyway: bool = False,
                                   clear_original: bool = True,
-                                  start_method: str = 'cube') -> None:
+                                  start_method: Optional[str] = None) -> None:
         """
         The function populates the CMF's start points with the points that are within the shards.
 
-        The function preforms the following steps:
+        Using the 'chebyshev' method, the start points are the lattice points around the Chebyshev center of each shard
+        (or the closest lattice point to the origin inside thin shards), so every shard with lattice points gets one.
+        Otherwise, the function preforms the following steps:
         * First, use the estimate radius using the feasible points found in the process of finding the shards.
         * If the first stage was unsuccessful, enlarge the set of potential starting points by adding
          a cube of an increasing edge length.
@@ -270,12 +354,27 @@ class ShardExtractor:
          starting points.
         :param clear_original: Clear the currently found start points.
         :param start_method: The method to use for generating starting points
-            (cube / sphere of a specified radius computed internally)
+            (chebyshev / cube / sphere of a specified radius computed internally),
+            defaults to analysis_config.START_POINT_METHOD
         """
         if self._populated:
             return
         self._populated = True
         shards = self.get_shards()
+        start_method = analysis_config.START_POINT_METHOD if start_method is None else start_method
+        # the cached start points are reused only if they were generated the same way
+        settings = json.dumps(
+            {'method': start_method} if start_method == 'chebyshev' else
+            {'method': start_method, 'feasible': use_feasible, 'expand': expand_anyway,
+             'expansions': analysis_config.MAX_EXPANSIONS}
+        )
+        if self._start_points is not None and self._start_settings == settings:
+            self.__assign_start_points(self._start_points, clear_original)
+            return
+        self._start_settings = settings
+        if start_method == 'chebyshev':
+            self.__assign_start_points(self.__chebyshev_start_points(), clear_original)
+            return
         point_classification = {shard_id: [] for shard_id in self._encoded_shards}
         expansion_factor = np.sqrt(len(self.symbols))
 
@@ -290,6 +389,7 @@ class ShardExtractor:
                     expand_search = True
                     break
             if not expand_search and not expand_anyway:
+                self.__assign_start_points(point_classification, clear_original)
                 return
 
         first_iteration = True
@@ -311,13 +411,15 @@ class ShardExtractor:
             first_iteration = False
 
             # classify points
-            for point in curr_points:
-                point = Position(list(point), self.symbols) + self.shifts
-                encoded, valid = self.encode_point(point, self.hps)
-                if not valid:
-                    continue
+            points = np.array(list(curr_points), dtype=np.int64).reshape(len(curr_points), len(self.symbols))
+            shifted = points + self.plane_set.as_array(self.shifts)
+            signs = self.plane_set.classify(shifted)
+            valid = np.all(signs != 0, axis=1)
+            for point, encoded in zip(points[valid], signs[valid]):
                 try:
-                    point_classification[encoded].append(point)
+                    point_classification[tuple(int(s) for s in encoded)].append(
+                        Position([int(c) for c in point], self.symbols) + self.shifts
+                    )
                 except KeyError:
                     Logger('Shard was not detected! Stopping... :(', Logger.Levels.fatal).log()
 
@@ -329,23 +431,52 @@ class ShardExtractor:
                     break
             curr_points = total_points
 
-        for shard in shards:
+        self.__assign_start_points(point_classification, clear_original)
+
+    def __chebyshev_start_points(self) -> Dict[ShardVec, List[Position]]:
+        """
+        Find start points in each shard by rounding its Chebyshev center to the (shifted) lattice
+        :return: A mapping from each shard vector to the start points found in it
+        """
+        worker = partial(
+            ShardExtractor._lattice_points_worker,
+            arrangement=HyperplaneArrangement(self.hps, self.symbols),
+            shift=self.plane_set.as_array(self.shifts)
+        )
+        if analysis_config.PARALLEL_SHARD_VALIDATION:
+            results = PoolManager.map(worker, self._encoded_shards, chunksize=analysis_config.SHARD_VALIDATION_CHUNK)
+        else:
+            results = map(worker, self._encoded_shards)
+
+        point_classification = {}
+        for shard_id, points in tqdm(zip(self._encoded_shards, results), desc='Placing start points',
+                                     total=len(self._encoded_shards), **sys_config.TQDM_CONFIG):
+            point_classification[shard_id] = [
+                Position([int(c) for c in point], self.symbols) + self.shifts for point in points
+            ]
+        return point_classification
+
+    def __assign_start_points(self, point_classification: Dict[ShardVec, List[Position]], clear_original: bool) -> None:
+        """
+        Add the classified start points to their shards and store them in the shard cache
+        :param point_classification: A mapping from each shard vector to the start points found in it
+        :param clear_original: Clear the currently found start points.
+        """
+        for shard in self.get_shards():
             if clear_original:
                 shard.clear_start_points()
             shard.add_start_points(point_classification[shard.shard_id], filtering=False)
+        self._start_points = point_classification
+        self.__update_cache()
 
     @staticmethod
-    def encode_point(point: Position, hps: List[Plane]) -> Tuple[ShardVec, bool]:
+    def encode_point(point: Position, hps: List[Plane] | PlaneSet) -> Tuple[ShardVec, bool]:
         """
         Encodes the shard that the point is within its borders.
         :param point: The point as a tuple
-        :param hps: The hyperplanes defining the shards
+        :param hps: The hyperplanes defining the shards (preferably already compiled as a PlaneSet)
         :return: The Shard encoding +-1's vector, True if the point is not on a hyperplane, else False.
         """
-        def sign(n):
-            if abs(n) <= 1e-4:
-                return 0
-            return 1 if n > 0 else -1
-
-        point.set_axis(hps[0].symbols)
-        return (encoded := tuple(sign(float(plane.expression.subs(point).evalf())) for plane in hps)), 0 not in encoded
+        if not isinstance(hps, PlaneSet):
+            hps = PlaneSet(hps)
+        return hps.encode(point)
@@ -0,0 +1,72 @@
+from rt_search.utils.types import *
+from rt_search.configs import analysis_config
+
+from sympy.polys.matrices import DomainMatrix
+from functools import lru_cache, reduce
+
+
+def _factor_locus(poly: sp.Poly) -> Set[EqTup]:
+    """
+    Find the zero locus of a polynomial by factoring it.
+    Linear factors f are returned directly as (f, 0), other factors fall back to sympy.solve().
+    :param poly: The polynomial to find its zeros
+    :return: The set of the zero locus expressions (lhs, rhs)
+    """
+    locus = set()
+    if poly.is_ground:
+        return locus
+
+    _, factors = poly.factor_list()
+    for factor, _ in factors:
+        if factor.is_ground:
+            continue
+        if factor.total_degree() == 1:
+            locus.add((factor.as_expr(), sp.Integer(0)))
+        else:
+            locus |= {tuple(sol.items())[0] for sol in sp.solve(factor.as_expr(), dict=True)}
+    return locus
+
+
+def _fraction_free_det(mat: sp.Matrix, symbols: List[sp.Symbol]) -> sp.Poly:
+    """
+    Compute the numerator of the determinant of a matrix of rational functions.
+    Each row is multiplied by the LCM of its entries' denominators and the determinant of the resulting polynomial
+    matrix is computed division free (Berkowitz) over the polynomial ring.
+    The rows' denominators are then cancelled out of the determinant.
+    :param mat: The matrix
+    :param symbols: The symbols of the matrix
+    :return: The numerator of the determinant as a polynomial
+    """
+    dm = DomainMatrix.from_Matrix(mat)
+    if not dm.domain.is_Exact:
+        return sp.Poly(sp.numer(sp.together(mat.det())), *symbols)
+
+    dens = None
+    if dm.domain.is_Field:
+        dens, dm = dm.clear_denoms_rowwise(convert=True)
+
+    # det(M) = (-1)^n * p(0) where p is the characteristic polynomial of M
+    ring = dm.domain
+    det = dm.charpoly()[-1] * (-1) ** dm.shape[0]
+    if dens is not None and det:
+        det, _ = det.cancel(reduce(lambda a, b: a * b, dens.diagonal(), ring.one))
+    return sp.Poly.from_dict(dict(det), *ring.symbols, domain=ring.domain)
+
+
+@lru_cache(maxsize=128 if analysis_config.USE_CACHING else 0)
+def singular_locus(mat: sp.ImmutableMatrix) -> Tuple[FrozenSet[EqTup], FrozenSet[EqTup]]:
+    """
+    Find the expressions for which the matrix is undefined or its determinant is 0
+    :param mat: The matrix to preform the calculations on (immutable for caching)
+    :return: The set of expressions for undefined hyperplanes (lhs, rhs);
+        The set of expressions for zero determinant hyperplanes (lhs, rhs)
+    """
+    symbols = sorted(mat.free_symbols, key=lambda sym: sym.name)
+    if not symbols:
+        return frozenset(), frozenset()
+
+    undef = set()
+    for den in {v.as_numer_denom()[1] for v in mat.iter_values()}:
+        undef |= _factor_locus(sp.Poly(den, *symbols))
+    z_det = _factor_locus(_fraction_free_det(mat, symbols))
+    return frozenset(undef), frozenset(z_det)
@@ -4,11 +4,14 @@ from rt_search.utils.geometry.point_generator import PointGenerator
 from rt_search.configs import *
 from functools import partial
 from dataclasses import dataclass
+from itertools import combinations, combinations_with_replacement
+import numpy as np
 from concurrent.futures import ProcessPoolExecutor
 
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from rt_search.analysis_stage.subspaces.searchable import Searchable
+    from rt_search.analysis_stage.subspaces.shard.shard import Shard
 
 
 @dataclass
@@ -29,14 +32,114 @@ class TrajectoryGenerator:
         self.point_groups = dict()
         # self.pool = ProcessPoolExecutor() if pool is None else pool
 
-    def get_trajectories(self, method: str, length: int, as_primitive: bool):
+    def get_trajectories(self, method: str, length: int, as_primitive: bool) -> np.ndarray:
+        """
+        Generate (once per point group) the trajectories of a shape
+        :param method: The shape of the trajectories (cube / sphere)
+        :param length: The side length or radius length of the shape
+        :param as_primitive: Keep only trajectories whose coordinates have gcd 1
+        :return: An (N, dim) integer array of the trajectories
+        """
         group = PointGroup(method, self.dim, as_primitive)
         if group not in self.point_groups:
-            self.point_groups[group] = PointGenerator.generate_via_shape(
+            self.point_groups[group] = PointGenerator.generate_via_shape_array(
                 length, self.dim, method, as_primitive, False
             )
         return self.point_groups[group]
 
+    def get_cone_trajectories(self, space: "Shard", radius: int | sp.Rational, n: Optional[int] = None) -> np.ndarray:
+        """
+        Generate (once per shard and radius) primitive trajectories of norm at most radius directly inside the recession
+        cone of a shard, i.e. the directions t with s_i * (N_i·t) >= 0 for every facet i, so that every trajectory is
+        valid from any start point in the shard. \n
+        The trajectories are the primitive parts of non-negative integer combinations of the cone's generators, taken in
+        increasing total coefficient until a total adds no new trajectory within the radius.
+        :param space: The shard
+        :param radius: The maximal norm of a trajectory
+        :param n: The maximal number of trajectories (the shortest are kept), defaults to all of them
+        :return: An (N, dim) integer array of the trajectories ordered by norm
+        """
+        group = PointGroup('cone', self.dim, True, space)
+        # the trajectories are stored with the radius they were generated for, a larger radius generates them again
+        if group not in self.point_groups or self.point_groups[group][0] < radius:
+            generators = self.cone_generators(space.facet_set.normals, space.facet_signs)
+            self.point_groups[group] = (radius, self.__cone_combinations(generators, radius))
+        stored_radius, trajectories = self.point_groups[group]
+        if stored_radius > radius:
+            trajectories = trajectories[np.sum(trajectories * trajectories, axis=1) <= float(radius) ** 2]
+        return trajectories if n is None else trajectories[:n]
+
+    @staticmethod
+    def cone_generators(normals: np.ndarray, signs: np.ndarray) -> np.ndarray:
+        """
+        Compute a generating set of the cone {t : signs_i * (normals_i·t) >= 0}. \n
+        The cone is the sum of its lineality space L (generated by +-basis vectors) and a pointed cone in the orthogonal
+        complement of L, whose extreme rays are found by intersecting every (dim - dim(L) - 1) facets with L's
+        orthogonal complement (an integer vector of the intersection is given by the signed maximal minors).
+        :param normals: A (k, d) integer array of the facets' normals
+        :param signs: The side (+-1) of the cone with respect to each facet
+        :return: An (m, d) integer array of primitive generators (m = 0 if the cone is {0})
+        """
+        dim = normals.shape[1]
+        A = sp.Matrix(signs[:, None] * normals).applyfunc(sp.nsimplify) if len(normals) else sp.zeros(0, dim)
+        lineality = [
+            np.array(v.T * sp.ilcm(*[sp.fraction(c)[1] for c in v]), dtype=np.int64).ravel()
+            for v in (A.nullspace() if A.rows else sp.eye(dim).columnspace())
+        ]
+        generators = [v for basis in lineality for v in (basis, -basis)]
+
+        A = np.array(A, dtype=float).reshape(-1, dim)
+        rank = dim - len(lineality)
+        if rank > 0:
+            subsets = list(combinations(range(len(A)), rank - 1))
+            subsets = np.array(subsets, dtype=np.int64).reshape(len(subsets), rank - 1)
+            equalities = np.array(lineality, dtype=float).reshape(-1, dim)
+            systems = np.concatenate([A[subsets], np.broadcast_to(equalities, (len(subsets), *equalities.shape))], 1)
+            # the kernel of a (d-1)xd matrix of rank d-1 is spanned by its signed maximal minors
+            rays = np.stack([(-1) ** j * np.linalg.det(np.delete(systems, j, axis=2)) for j in range(dim)], axis=1)
+            rays = np.rint(rays).astype(np.int64)
+            rays = rays[np.any(rays != 0, axis=1)]
+            values = rays @ A.T
+            rays = np.vstack([rays[np.all(values >= 0, axis=1)], -rays[np.all(values <= 0, axis=1)]])
+            generators += list(rays)
+
+        if not generators:
+            return np.zeros((0, dim), dtype=np.int64)
+        generators = np.array(generators, dtype=np.int64)
+        generators //= np.gcd.reduce(generators, axis=1)[:, None]
+        return np.unique(generators, axis=0)
+
+    @staticmethod
+    def __cone_combinations(generators: np.ndarray, radius: int | sp.Rational) -> np.ndarray:
+        """
+        Build the distinct primitive parts of non-negative integer combinations of generators within a radius
+        :param generators: An (m, d) integer array of generators
+        :param radius: The maximal norm of a combination kept
+        :return: An (N, d) integer array of the combinations found, ordered by norm
+        """
+        dim = generators.shape[1]
+        bound = float(radius) ** 2
+        seen = set()
+        found = []
+        degree = 1
+        while len(generators) > 0:
+            combos = np.array(list(combinations_with_replacement(range(len(generators)), degree)), dtype=np.int64)
+            coeffs = np.zeros((len(combos), len(generators)), dtype=np.int64)
+            np.add.at(coeffs, (np.repeat(np.arange(len(combos)), degree), combos.ravel()), 1)
+            points = coeffs @ generators
+            points = points[np.any(points != 0, axis=1)]
+            points //= np.gcd.reduce(points, axis=1)[:, None]
+            points = points[np.sum(points * points, axis=1) <= bound]
+
+            new = [p for p in map(tuple, np.unique(points, axis=0).tolist()) if p not in seen]
+            if not new:
+                break
+            seen.update(new)
+            found += new
+            degree += 1
+        found = np.array(found, dtype=np.int64).reshape(-1, dim)
+        return found[np.argsort(np.sum(found * found, axis=1), kind='stable')]
+
     # def sort_trajectories_to_searchables(self, group: PointGroup,
     #                                      start_points: List[Position],
     #                                      searchables: List[Searchable]) -> Optional[Dict[Searchable, List[Position]]]:
@@ -0,0 +1,65 @@
+import unittest
+import tempfile
+import os
+
+from rt_search.configs import sys_config
+from rt_search.system.constants import ConstantRegistry
+from rt_search.utils.pool import PoolManager
+
+import mpmath as mp
+
+
+def _known_digits(constant):
+    return ConstantRegistry._values[constant][0]
+
+
+class TestConstantRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path, sys_config.CONSTANTS_CACHE_PATH = (
+            sys_config.CONSTANTS_CACHE_PATH, os.path.join(self.dir.name, 'constants.db')
+        )
+        ConstantRegistry._values = {}
+        ConstantRegistry._shared = {}
+
+    def tearDown(self):
+        PoolManager._initializers.pop('constants', None)
+        PoolManager.shutdown()
+        ConstantRegistry._values = {}
+        ConstantRegistry._shared = {}
+        sys_config.CONSTANTS_CACHE_PATH = self.path
+        self.dir.cleanup()
+
+    def test_tiers(self):
+        self.assertEqual(ConstantRegistry.tier(10), ConstantRegistry.MIN_TIER)
+        self.assertEqual(ConstantRegistry.tier(100), 128)
+        self.assertEqual(ConstantRegistry.tier(128), 128)
+        self.assertEqual(ConstantRegistry.tier(sys_config.MAX_WORKING_DIGITS + 1), sys_config.MAX_WORKING_DIGITS + 1)
+
+    def test_get_and_persist(self):
+        value = ConstantRegistry.get('pi', 100)
+        with mp.workdps(100):
+            self.assertLess(abs(value - mp.pi), mp.mpf(10) ** -99)
+        self.assertIs(ConstantRegistry.get('pi', 50), value)
+        self.assertEqual(_known_digits('pi'), 128)
+
+        # a fresh registry loads the stored tier instead of computing it
+        ConstantRegistry._values = {}
+        with mp.workdps(128):
+            self.assertEqual(ConstantRegistry.get('pi', 80), value)
+
+    def test_unusable_store(self):
+        # a directory cannot be opened as a database - the values are kept in memory only
+        sys_config.CONSTANTS_CACHE_PATH = self.dir.name
+        value = ConstantRegistry.get('pi', 100)
+        self.assertIs(ConstantRegistry.get('pi', 100), value)
+
+    def test_share(self):
+        ConstantRegistry.share(['pi'], 200)
+        ConstantRegistry._values = {}
+        self.assertEqual(PoolManager.map(_known_digits, ['pi', 'pi']), [256, 256])
+
+
+if __name__ == "__main__":
+    unittest.main()
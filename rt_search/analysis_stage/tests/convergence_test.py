@@ -0,0 +1,57 @@
+import unittest
+import numpy as np
+import mpmath as mp
+
+from rt_search.utils.convergence import convergent_errors, extrapolate_delta
+from rt_search.utils.precision import WorkingPrecision
+from rt_search.utils.types import *
+
+
+class TestDeltaExtrapolation(unittest.TestCase):
+
+    def test_convergent_errors(self):
+        depths, log_errors, log_denoms = convergent_errors({2: sp.Rational(22, 7), 1: sp.Integer(3)}, sp.pi)
+        self.assertEqual([1, 2], depths)
+        self.assertAlmostEqual(float(np.log(float(sp.pi) - 3)), log_errors[0])
+        self.assertAlmostEqual(float(np.log(22 / 7 - float(sp.pi))), log_errors[1])
+        self.assertEqual([0, float(np.log(7))], log_denoms)
+        self.assertEqual([float('-inf')], convergent_errors({1: sp.Rational(1, 2)}, sp.Rational(1, 2))[1])
+
+    def test_extrapolate_delta(self):
+        depths = [25, 50, 100, 200]
+        log_denoms = [2.75 * d + 20 for d in depths]
+        log_errors = [-3.5 * d + 10 for d in depths]
+        delta, confidence = extrapolate_delta(depths, log_errors, log_denoms)
+        self.assertAlmostEqual(3.5 / 2.75 - 1, delta)
+        self.assertAlmostEqual(1, confidence)
+        # the delta of the deepest convergent alone is biased by the constant terms
+        self.assertGreater(abs(-1 - log_errors[-1] / log_denoms[-1] - delta), 0.01)
+
+        jittered = [q + 15 * (-1) ** i for i, q in enumerate(log_denoms)]
+        self.assertLess(extrapolate_delta(depths, log_errors, jittered)[1], confidence)
+        self.assertEqual((None, 0.0), extrapolate_delta(depths, [float('-inf')] * 4, log_denoms))
+
+    def test_working_precision(self):
+        dps = mp.mp.dps
+        precision = WorkingPrecision(5, max_digits=200)
+        with precision:
+            self.assertEqual(5 + WorkingPrecision.GUARD_DIGITS, mp.mp.dps)
+        self.assertEqual(dps, mp.mp.dps)
+
+        # 355/113 agrees with pi to ~7 digits - resolving its error takes one escalation
+        errors = precision.run(
+            lambda: convergent_errors({1: sp.Rational(355, 113)}, sp.pi)[1][0],
+            lambda e: e > -(mp.mp.dps - WorkingPrecision.GUARD_DIGITS) * np.log(10)
+        )
+        self.assertAlmostEqual(float(mp.log(mp.fabs(mp.mpf(355) / 113 - mp.pi))), errors)
+        self.assertEqual(50, precision.digits)
+        self.assertEqual(dps, mp.mp.dps)
+
+        precision.digits = 150
+        self.assertTrue(precision.escalate())
+        self.assertEqual(200, precision.digits)
+        self.assertFalse(precision.escalate())
+
+
+if __name__ == "__main__":
+    unittest.main()
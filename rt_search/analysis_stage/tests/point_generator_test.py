@@ -0,0 +1,73 @@
+import unittest
+import tracemalloc
+import math
+import numpy as np
+from itertools import product
+
+from rt_search.utils.geometry.point_generator import PointGenerator
+
+
+class TestPointGenerator(unittest.TestCase):
+
+    def test_primitive_sphere(self):
+        radius, dim = 4, 3
+        expected = {
+            p for p in product(range(-radius, radius + 1), repeat=dim)
+            if math.gcd(*p) == 1 and sum(c * c for c in p) <= radius ** 2
+        }
+        points = PointGenerator.generate_sphere_array(radius, dim, as_primitive=True)
+        self.assertEqual(points.shape, (len(expected), dim))
+        self.assertEqual(PointGenerator.as_point_set(points), expected)
+        self.assertEqual(PointGenerator.generate_via_shape(radius, dim, 'sphere', True), expected)
+        self.assertEqual(len(PointGenerator.generate_cube_array(2, dim)), 5 ** dim)
+
+    def test_random_sphere(self):
+        radius, dim, n = 10, 8, 5000
+        for low_discrepancy in (False, True):
+            points = PointGenerator.generate_random_sphere(n, radius, dim, True, 7, low_discrepancy)
+            self.assertEqual(points.shape, (n, dim))
+            self.assertEqual(len(PointGenerator.as_point_set(points)), n)
+            self.assertTrue(np.all(np.gcd.reduce(points, axis=1) == 1))
+            self.assertTrue(np.all(np.sum(points * points, axis=1) <= radius ** 2))
+            self.assertTrue(np.array_equal(
+                points, PointGenerator.generate_random_sphere(n, radius, dim, True, 7, low_discrepancy)
+            ))
+
+        # fewer points than requested - all of them are returned
+        self.assertEqual(
+            PointGenerator.as_point_set(PointGenerator.generate_random_sphere(1000, 2, 2, True, 7)),
+            PointGenerator.generate_sphere(2, 2, True)
+        )
+
+    def test_shell_stream(self):
+        for dim in (1, 2, 4):
+            chunks = list(PointGenerator.iter_shells(dim, True, chunk_size=50, max_radius=4))
+            self.assertTrue(all(len(chunk) == 50 for chunk in chunks[:-1]))
+            points = np.vstack(chunks)
+            norms = np.sum(points * points, axis=1)
+            self.assertTrue(np.all(np.diff(norms) >= 0))
+            self.assertEqual(
+                PointGenerator.as_point_set(points), PointGenerator.generate_sphere(4, dim, as_primitive=True)
+            )
+
+    def test_shell_stream_memory(self):
+        block = PointGenerator.SHELL_BLOCK
+        PointGenerator.SHELL_BLOCK = 1024
+        tracemalloc.start()
+        try:
+            # the points of radius up to ~6 in 6D - a single squared norm holds ~10^4 of them
+            streamed = 0
+            for chunk in PointGenerator.iter_shells(6, True, chunk_size=256):
+                streamed += len(chunk)
+                if streamed >= 2 * 10 ** 5:
+                    break
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+            PointGenerator.SHELL_BLOCK = block
+        # a few blocks of prefixes and chunks of points, independent of the radius reached
+        self.assertLess(peak, 2 ** 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
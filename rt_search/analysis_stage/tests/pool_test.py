@@ -0,0 +1,63 @@
+import unittest
+import operator
+from functools import partial
+import os
+
+from rt_search.configs import sys_config
+from rt_search.utils.pool import PoolManager
+
+
+def _pid(_):
+    return os.getpid()
+
+
+def _recycle_tasks(_):
+    return sys_config.POOL_RECYCLE_TASKS
+
+
+class TestPoolManager(unittest.TestCase):
+
+    def tearDown(self):
+        PoolManager.shutdown()
+
+    def test_reuse_and_recycle(self):
+        recycle = sys_config.POOL_RECYCLE_TASKS
+        sys_config.POOL_RECYCLE_TASKS = 10
+        try:
+            self.assertEqual(PoolManager.map(partial(operator.mul, 2), range(6)), [0, 2, 4, 6, 8, 10])
+            pool = PoolManager.get()
+            self.assertIs(pool, PoolManager.get())
+
+            PoolManager.map(abs, range(-5, 0), chunksize=2)
+            self.assertIsNot(pool, PoolManager.get())
+        finally:
+            sys_config.POOL_RECYCLE_TASKS = recycle
+
+        PoolManager.shutdown()
+        self.assertIsNone(PoolManager._pool)
+
+    def test_recycle_within_map(self):
+        recycle = sys_config.POOL_RECYCLE_TASKS
+        sys_config.POOL_RECYCLE_TASKS = 10
+        try:
+            # the workers see the configuration of the running system
+            self.assertEqual([10] * 3, PoolManager.map(_recycle_tasks, range(3)))
+            PoolManager.shutdown()
+            pids = PoolManager.map(_pid, range(25))
+        finally:
+            sys_config.POOL_RECYCLE_TASKS = recycle
+        self.assertFalse(set(pids[:10]) & set(pids[10:20]))
+        self.assertFalse(set(pids[10:20]) & set(pids[20:]))
+
+    def test_config_snapshot(self):
+        recycle = sys_config.POOL_RECYCLE_TASKS
+        try:
+            PoolManager._install_configs({'system': {'POOL_RECYCLE_TASKS': 7}})
+            self.assertEqual(7, sys_config.POOL_RECYCLE_TASKS)
+        finally:
+            sys_config.POOL_RECYCLE_TASKS = recycle
+        self.assertEqual(recycle, PoolManager._config_snapshot()['system']['POOL_RECYCLE_TASKS'])
+
+
+if __name__ == "__main__":
+    unittest.main()
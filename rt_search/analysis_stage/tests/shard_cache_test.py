@@ -0,0 +1,72 @@
+import unittest
+import tempfile
+import os
+
+from rt_search.utils.geometry.plane import Plane
+from rt_search.utils.types import *
+from rt_search.utils.cmf import pFq
+from rt_search.configs import analysis_config
+from rt_search.analysis_stage.subspaces.shard.shard_cache import ShardCache, ShardCacheEntry
+
+x0, x1, y0 = sp.symbols('x0 x1 y0')
+
+
+class TestShardCache(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.dir = tempfile.TemporaryDirectory()
+        cls.cmf = pFq(2, 1, sp.Rational(1, 2))
+        cls.shift = Position([0, 0, sp.Rational(1, 2)], [x0, x1, y0])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.dir.cleanup()
+
+    def test_store_and_load(self):
+        cache = ShardCache(os.path.join(self.dir.name, 'store.db'))
+        symbols = [x0, x1, y0]
+        entry = ShardCacheEntry(
+            hps=[Plane(x0, symbols), Plane(x1 - y0 + 1, symbols)],
+            symbols=symbols,
+            encoded_shards=[(1, 1), (-1, 1)],
+            feasible_points=[[1.0, 1.0, 0.0], [-1.0, 1.0, 0.0]],
+            start_points={(1, 1): [Position([1, 2, sp.Rational(1, 2)], symbols)], (-1, 1): []},
+            start_settings='{"method": "chebyshev"}'
+        )
+        self.assertIsNone(cache.load(self.cmf, self.shift))
+        cache.store(self.cmf, self.shift, entry)
+
+        loaded = cache.load(self.cmf, self.shift)
+        self.assertEqual([plane.expression for plane in entry.hps], [plane.expression for plane in loaded.hps])
+        self.assertEqual(entry.symbols, loaded.symbols)
+        self.assertEqual(entry.encoded_shards, loaded.encoded_shards)
+        self.assertEqual(entry.feasible_points, loaded.feasible_points)
+        self.assertEqual(entry.start_points, loaded.start_points)
+        self.assertEqual(entry.start_settings, loaded.start_settings)
+        self.assertIsNone(cache.load(self.cmf, Position([0, 0, 0], symbols)))
+
+    def test_settings_in_key(self):
+        key = ShardCache.key(self.cmf, self.shift)
+        known, analysis_config.USE_KNOWN_HYPERPLANES = analysis_config.USE_KNOWN_HYPERPLANES, False
+        try:
+            self.assertNotEqual(key, ShardCache.key(self.cmf, self.shift))
+        finally:
+            analysis_config.USE_KNOWN_HYPERPLANES = known
+        self.assertEqual(key, ShardCache.key(self.cmf, self.shift))
+
+    def test_version_invalidation(self):
+        cache = ShardCache(os.path.join(self.dir.name, 'version.db'))
+        cache.store(self.cmf, self.shift, ShardCacheEntry([], [x0, x1, y0]))
+        self.assertIsNotNone(cache.load(self.cmf, self.shift))
+
+        ShardCache.VERSION += 1
+        try:
+            self.assertIsNone(cache.load(self.cmf, self.shift))
+        finally:
+            ShardCache.VERSION -= 1
+        self.assertIsNone(cache.load(self.cmf, self.shift))
+
+
+if __name__ == "__main__":
+    unittest.main()
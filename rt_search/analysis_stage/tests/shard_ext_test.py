@@ -1,4 +1,5 @@
 import unittest
+import time
 from contextlib import contextmanager
 
 from itertools import product
@@ -7,6 +8,16 @@ from scipy.optimize import linprog
 import numpy as np
 
 from rt_search.utils.geometry.plane import Plane
+from rt_search.utils.geometry.plane_set import PlaneSet
+from rt_search.analysis_stage.subspaces.shard.shard import Shard
+from rt_search.analysis_stage.subspaces.shard.arrangement import HyperplaneArrangement
+from rt_search.analysis_stage.subspaces.shard.singular_locus import singular_locus
+from rt_search.analysis_stage.subspaces.shard.shard_extraction import ShardExtractor
+from rt_search.utils.geometry.point_generator import PointGenerator
+from rt_search.utils.cmf import pFq
+from rt_search.search_stage.data_manager import SearchVector
+from rt_search.search_stage.methods.serial.serial_searcher import SerialSearcher
+from rt_search.configs import search_config
 from rt_search.utils.types import *
 from rt_search.configs.analysis import *
 
@@ -73,6 +84,204 @@ class TestDB(unittest.TestCase):
         # self.assertEqual(encoded, [(1, 1, 1, 1, 1, 1, 1), (1, 1, 1, 1, 1, 1, -1), (1, 1, 1, 1, 1, -1, 1), (1, 1, 1, 1, 1, -1, -1), (1, 1, 1, 1, -1, 1, 1), (1, 1, 1, 1, -1, 1, -1), (1, 1, 1, 1, -1, -1, 1), (1, 1, 1, 1, -1, -1, -1), (1, 1, 1, -1, 1, 1, 1), (1, 1, 1, -1, 1, 1, -1), (1, 1, 1, -1, 1, -1, 1), (1, 1, 1, -1, 1, -1, -1), (1, 1, 1, -1, -1, 1, 1), (1, 1, 1, -1, -1, 1, -1), (1, 1, 1, -1, -1, -1, 1), (1, 1, 1, -1, -1, -1, -1), (1, 1, -1, 1, 1, 1, 1), (1, 1, -1, 1, 1, 1, -1), (1, 1, -1, 1, 1, -1, 1), (1, 1, -1, 1, 1, -1, -1), (1, 1, -1, 1, -1, 1, 1), (1, 1, -1, 1, -1, 1, -1), (1, 1, -1, 1, -1, -1, 1), (1, 1, -1, 1, -1, -1, -1), (1, 1, -1, -1, 1, 1, 1), (1, 1, -1, -1, 1, 1, -1), (1, 1, -1, -1, 1, -1, 1), (1, 1, -1, -1, 1, -1, -1), (1, 1, -1, -1, -1, 1, 1), (1, 1, -1, -1, -1, 1, -1), (1, 1, -1, -1, -1, -1, 1), (1, 1, -1, -1, -1, -1, -1), (1, -1, 1, -1, -1, 1, -1), (1, -1, 1, -1, -1, -1, -1), (1, -1, -1, -1, 1, 1, -1), (1, -1, -1, -1, 1, -1, -1), (1, -1, -1, -1, -1, 1, -1), (1, -1, -1, -1, -1, -1, -1), (-1, 1, -1, 1, 1, -1, -1), (-1, 1, -1, 1, -1, -1, -1), (-1, 1, -1, -1, 1, 1, -1), (-1, 1, -1, -1, 1, -1, -1), (-1, 1, -1, -1, -1, 1, -1), (-1, 1, -1, -1, -1, -1, -1), (-1, -1, -1, -1, 1, 1, -1), (-1, -1, -1, -1, 1, -1, -1), (-1, -1, -1, -1, -1, 1, -1), (-1, -1, -1, -1, -1, -1, -1)])
 
 
+    def test_incremental_enumeration(self):
+        symbols = [x0, x1, y0]
+        hps = [
+            Plane(y0, symbols),
+            Plane(x0, symbols),
+            Plane(x1, symbols),
+            Plane(-x0 + y0, symbols),
+            Plane(-x1 + y0, symbols),
+            Plane(x0 + x1 - 2 * y0 + 1, symbols)
+        ]
+
+        arrangement = HyperplaneArrangement(hps, symbols)
+        cells = arrangement.enumerate_cells(show_progress=False)
+        encoded = [shard for shard, _ in cells]
+        self.assertEqual(get_encoded_shards(hps, symbols), encoded)
+        self.assertEqual(encoded, [shard for shard, _ in arrangement.enumerate_subtree(tuple(), np.zeros(3))])
+        for shard, point in cells:
+            values = arrangement.values(np.array(point))
+            self.assertTrue(all(s * v > 0 for s, v in zip(shard, values)))
+
+    def test_lattice_points(self):
+        symbols = [x0, x1, y0]
+        hps = [
+            Plane(y0, symbols),
+            Plane(x0, symbols),
+            Plane(-x0 + y0, symbols),
+            Plane(x0 + x1 - 2 * y0 + 1, symbols),
+            Plane(3 * x1 - 1, symbols)
+        ]
+        shift = np.array([0, 0, 0.5])
+
+        arrangement = HyperplaneArrangement(hps, symbols)
+        box = np.array(list(product(range(-6, 7), repeat=3))) + shift
+        signs = np.sign(box @ arrangement.coeffs.T + arrangement.consts)
+        expected = {tuple(int(s) for s in vec) for vec in signs if 0 not in vec}
+
+        found = set()
+        for shard, _ in arrangement.enumerate_cells(show_progress=False):
+            points = arrangement.lattice_points(shard, shift, 1e-4)
+            self.assertTrue(np.all(arrangement.contains(shard, points + shift, 1e-4)))
+            if len(points) > 0:
+                found.add(shard)
+        self.assertTrue(expected.issubset(found))
+
+    def test_facets(self):
+        cmf = pFq(2, 1, sp.Rational(1, 2))
+        symbols = list(cmf.matrices.keys())
+        use_cache, analysis_config.USE_SHARD_CACHE = analysis_config.USE_SHARD_CACHE, False
+        try:
+            extractor = ShardExtractor('pi', cmf, Position([0, 0, 0], symbols))
+            shards = extractor.get_shards()
+        finally:
+            analysis_config.USE_SHARD_CACHE = use_cache
+
+        arrangement = HyperplaneArrangement(extractor.hps, symbols)
+        for shard in shards:
+            # hyperplane i is a facet iff the shard's other constraints allow crossing it
+            signs = np.array(shard.shard_id, dtype=float)
+            A = -signs[:, None] * arrangement.coeffs
+            b = signs * arrangement.consts - AnalysisConfig.SHARD_EXTRACTOR_ERR
+            facets = []
+            for i in range(len(signs)):
+                others = [j for j in range(len(signs)) if j != i]
+                # minimize s_i * a_i·x over the other constraints, bounded by s_i * (a_i·x + c_i) >= -1
+                res = linprog(
+                    c=-A[i], A_ub=np.vstack([A[others], A[i]]),
+                    b_ub=np.append(b[others], 1 + signs[i] * arrangement.consts[i]),
+                    bounds=[(None, None)] * len(symbols), method='highs'
+                )
+                if res.status == 0 and signs[i] * (arrangement.coeffs[i] @ res.x + arrangement.consts[i]) < 0:
+                    facets.append(i)
+            self.assertEqual(facets, shard.facets)
+            for neighbour in shard.neighbours():
+                self.assertEqual(1, sum(s != t for s, t in zip(shard.shard_id, neighbour.shard_id)))
+
+    def test_cone_trajectories(self):
+        cmf = pFq(2, 1, sp.Rational(1, 2))
+        symbols = list(cmf.matrices.keys())
+        use_cache, analysis_config.USE_SHARD_CACHE = analysis_config.USE_SHARD_CACHE, False
+        try:
+            extractor = ShardExtractor('pi', cmf, Position([0, 0, 0], symbols))
+            shards = extractor.get_shards()
+        finally:
+            analysis_config.USE_SHARD_CACHE = use_cache
+
+        sphere = PointGenerator.generate_sphere_array(3, len(symbols), as_primitive=True)
+        for shard in shards:
+            if not shard.get_start_points():
+                continue
+            start = next(iter(shard.get_start_points()))
+            trajectories = shard.tg.get_cone_trajectories(shard, 3)
+            self.assertTrue(np.all(shard.trajectories_in_space(start, trajectories)))
+            # every direction of the recession cone within the radius is found
+            in_cone = np.all(shard.facet_signs * (sphere @ shard.facet_set.normals.T) >= 0, axis=1)
+            self.assertEqual(PointGenerator.as_point_set(sphere[in_cone]), PointGenerator.as_point_set(trajectories))
+            # a larger radius generates them again, a smaller one keeps the shortest
+            self.assertTrue(np.all(np.sum(shard.tg.get_cone_trajectories(shard, 5) ** 2, axis=1) <= 25))
+            self.assertLessEqual(len(trajectories), len(shard.tg.get_cone_trajectories(shard, 5)))
+            self.assertEqual(
+                PointGenerator.as_point_set(trajectories),
+                PointGenerator.as_point_set(shard.tg.get_cone_trajectories(shard, 3))
+            )
+            self.assertEqual(min(2, len(trajectories)), len(shard.tg.get_cone_trajectories(shard, 3, 2)))
+
+    def test_cone_trajectories_many_shards(self):
+        cmf = pFq(3, 2, -1)
+        symbols = list(cmf.matrices.keys())
+        use_cache, analysis_config.USE_SHARD_CACHE = analysis_config.USE_SHARD_CACHE, False
+        try:
+            shards = ShardExtractor('zeta-3', cmf, Position([0] * len(symbols), symbols)).get_shards()
+        finally:
+            analysis_config.USE_SHARD_CACHE = use_cache
+
+        radius = 4
+        sphere = PointGenerator.generate_sphere_array(radius, len(symbols), as_primitive=True)
+        start = time.time()
+        for shard in shards:
+            trajectories = shard.tg.get_cone_trajectories(shard, radius)
+            self.assertTrue(np.all(np.sum(trajectories * trajectories, axis=1) <= radius ** 2))
+            in_cone = np.all(shard.facet_signs * (sphere @ shard.facet_set.normals.T) >= 0, axis=1)
+            self.assertEqual(np.count_nonzero(in_cone), len(trajectories))
+        self.assertLess(time.time() - start, 60)
+
+    def test_symmetries(self):
+        cmf = pFq(3, 2, -1)
+        x = sp.symbols('x:3')
+        y = sp.symbols('y:2')
+        self.assertEqual([x, y], cmf.symmetries())
+
+        symbols = list(cmf.matrices.keys())
+        sv = SearchVector(Position([1, 2, 3, 4, 5], symbols), Position([0, 1, 0, 1, 1], symbols))
+        permuted = SearchVector(Position([3, 1, 2, 5, 4], symbols), Position([0, 0, 1, 1, 1], symbols))
+        other = SearchVector(Position([2, 1, 3, 4, 5], symbols), Position([0, 1, 0, 1, 1], symbols))
+        self.assertEqual(sv.canonical(cmf.symmetries()), permuted.canonical(cmf.symmetries()))
+        self.assertNotEqual(sv.canonical(cmf.symmetries()), other.canonical(cmf.symmetries()))
+
+    def test_canonical_planes(self):
+        symbols = [x0, x1, y0]
+        self.assertEqual((3, -2, 0, 6), Plane(-x0 / 2 + x1 / 3 - 1, symbols).canonical_key)
+        self.assertEqual(
+            Plane(2 * x0 - 4 * x1 + 6, symbols).canonical_key,
+            Plane(-x0 / 3 + 2 * x1 / 3 - 1, symbols).canonical_key
+        )
+        self.assertNotEqual(Plane(x0 - y0, symbols).canonical_key, Plane(x0 - y0 + 1, symbols).canonical_key)
+        self.assertEqual(x0 - 2 * x1 + 3, Plane(-2 * x0 + 4 * x1 - 6, symbols).canonical().expression)
+
+    def test_singular_locus(self):
+        cmf = pFq(2, 1, sp.Rational(1, 2))
+        symbols = list(cmf.matrices.keys())
+        as_keys = lambda eqs: {Plane(lhs - rhs, symbols).canonical_key for lhs, rhs in eqs}
+
+        for mat in cmf.matrices.values():
+            undef, z_det = singular_locus(sp.ImmutableMatrix(mat))
+            expected_undef = {
+                (sym, sol) for v in mat.iter_values() for sym in v.as_numer_denom()[1].free_symbols
+                for sol in sp.solve(v.as_numer_denom()[1], sym)
+            }
+            expected_z_det = {tuple(sol.items())[0] for sol in sp.solve(mat.det(), dict=True)}
+            self.assertEqual(as_keys(expected_undef), as_keys(undef))
+            self.assertEqual(as_keys(expected_z_det), as_keys(z_det))
+
+    def test_known_pfq_hyperplanes(self):
+        for p, q, z in [(2, 1, sp.Rational(1, 2)), (3, 2, -1), (2, 2, 2), (1, 1, sp.Rational(-3, 7)), (2, 0, -1)]:
+            cmf = pFq(p, q, z)
+            symbols = list(cmf.matrices.keys())
+            as_keys = lambda eqs: {Plane(lhs - rhs, symbols).canonical_key for lhs, rhs in eqs}
+
+            extracted = set()
+            for mat in cmf.matrices.values():
+                undef, z_det = singular_locus(sp.ImmutableMatrix(mat))
+                extracted |= undef | z_det
+            self.assertEqual(as_keys(extracted), as_keys(cmf.known_singular_hyperplanes()))
+        self.assertIsNone(pFq(2, 1, 1).known_singular_hyperplanes())
+        self.assertIsNone(pFq(2, 1, sp.Rational(1, 2), negate_denominator_params=False).known_singular_hyperplanes())
+
+    def test_stream_bounded_shard(self):
+        cmf = pFq(2, 1, sp.Rational(1, 2))
+        symbols = list(cmf.matrices.keys())
+        use_cache, analysis_config.USE_SHARD_CACHE = analysis_config.USE_SHARD_CACHE, False
+        try:
+            extractor = ShardExtractor('pi', cmf, Position([0, 0, 0], symbols))
+        finally:
+            analysis_config.USE_SHARD_CACHE = use_cache
+        # the box |x0|, |x1|, |y0| < 2 admits no trajectory at all
+        extractor.hps = [Plane(sym + c, symbols) for sym in symbols for c in (-2, 2)]
+        extractor.plane_set = PlaneSet(extractor.hps, symbols)
+        shard = Shard((-1, 1) * len(symbols), extractor)
+        shard.add_start_points(Position([0, 0, 0], symbols), filtering=False)
+
+        parallel, search_config.PARALLEL_SEARCH = search_config.PARALLEL_SEARCH, False
+        chunk, search_config.TRAJECTORY_STREAM_CHUNK = search_config.TRAJECTORY_STREAM_CHUNK, 16
+        try:
+            searcher = SerialSearcher(shard, sp.pi, use_LIReC=False)
+            self.assertEqual(0, len(searcher.search_stream(budget=10).get_data()))
+        finally:
+            search_config.PARALLEL_SEARCH = parallel
+            search_config.TRAJECTORY_STREAM_CHUNK = chunk
+
 def get_encoded_shards(hps, symbols) -> List[ShardVec]:
     """
     Compute the Shards as Shard vector identifiers
@@ -95,11 +304,11 @@ def get_encoded_shards(hps, symbols) -> List[ShardVec]:
         if greater_than_0:
             # a·x + c >= 0  ⇔  -a·x <= c
             row = [-coef for coef in a]
-            b = const - SHARD_EXTRACTOR_ERR
+            b = const - AnalysisConfig.SHARD_EXTRACTOR_ERR
         else:
             # a·x + c <= 0  ⇔  a·x <= -c
             row = [coef for coef in a]
-            b = -const - SHARD_EXTRACTOR_ERR
+            b = -const - AnalysisConfig.SHARD_EXTRACTOR_ERR
 
         return row, b
 
@@ -122,7 +331,7 @@ def get_encoded_shards(hps, symbols) -> List[ShardVec]:
             return False, []
 
         x = np.array(res.x, dtype=float) if res.x is not None else None
-        eps = max(SHARD_EXTRACTOR_ERR, 1e-12)
+        eps = max(AnalysisConfig.SHARD_EXTRACTOR_ERR, 1e-12)
         if x is None:
             return True, []
 
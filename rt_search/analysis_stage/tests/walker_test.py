@@ -0,0 +1,76 @@
+import unittest
+
+from rt_search.utils.cmf import pFq
+from rt_search.utils.walker import CompiledWalker
+from rt_search.utils.types import *
+
+
+class TestCompiledWalker(unittest.TestCase):
+
+    def test_matches_sympy_walk(self):
+        cmf = pFq(3, 2, sp.Integer(1))
+        traj_m = cmf.trajectory_matrix(
+            trajectory={sym: v for sym, v in zip(cmf.matrices.keys(), (1, 2, 1, 3, 2))},
+            start={sym: v for sym, v in zip(cmf.matrices.keys(), (1, 1, 1, 2, 2))}
+        )
+        n = list(traj_m.free_symbols)[0]
+        walker = CompiledWalker(traj_m)
+
+        self.assertEqual(walker.walk(0), traj_m.walk({n: 1}, 0, {n: 0}))
+        self.assertEqual(walker.walk([1, 5, 40]), traj_m.walk({n: 1}, [1, 5, 40], {n: 0}))
+        self.assertEqual(walker.limit(200), traj_m.limit({n: 1}, 200, {n: 0}))
+        self.assertEqual([lim.current for lim in walker.limit([5, 40])], walker.walk([5, 40]))
+
+        tree = CompiledWalker(traj_m, product_tree=True)
+        self.assertEqual(walker.walk_integer([0, 7, 300]), tree.walk_integer([0, 7, 300]))
+
+    def test_screen(self):
+        cmf = pFq(3, 2, sp.Integer(-1))
+        symbols = list(cmf.matrices.keys())
+        traj_m = cmf.trajectory_matrix(
+            trajectory=Position([1, 2, 1, 3, 2], symbols), start=Position([1, 1, 1, 2, 2], symbols)
+        )
+        walker = CompiledWalker(traj_m)
+        self.assertIsNone(walker.screen(2000))
+        self.assertEqual(traj_m.gcd_slope(), walker.gcd_slope())
+
+        undefined = cmf.trajectory_matrix(
+            trajectory=Position([1, 0, 0, 0, 0], symbols), start=Position([-3, 1, 1, 2, 2], symbols)
+        )
+        self.assertEqual('undefined step', CompiledWalker(undefined).screen(100))
+
+    def test_float_screen(self):
+        cmf = pFq(3, 2, sp.Integer(-1))
+        symbols = list(cmf.matrices.keys())
+        regular = cmf.trajectory_matrix(
+            trajectory=Position([1, 2, 1, 3, 2], symbols), start=Position([1, 1, 1, 2, 2], symbols)
+        )
+        cmf = pFq(2, 1, sp.Integer(-1))
+        symbols = list(cmf.matrices.keys())
+        rational = cmf.trajectory_matrix(
+            trajectory=Position([1, 0, 0], symbols), start=Position([sp.Rational(1, 2), 1, 2], symbols)
+        )
+        walkers = [CompiledWalker(regular), CompiledWalker(rational)]
+        self.assertEqual([None, None], CompiledWalker.float_screen(walkers, 512))
+        self.assertEqual([None, 'rational limit'], CompiledWalker.float_screen(walkers, 512, reject_rational=True))
+
+        # coefficients beyond the float range are scaled, leaving the steps unchanged
+        huge = CompiledWalker(regular)
+        huge.entries = [[c * 10 ** 400 for c in coeffs] for coeffs in huge.entries]
+        huge.scalar = [c * 10 ** 400 for c in huge.scalar]
+        self.assertEqual([None, None], CompiledWalker.float_screen([huge, walkers[0]], 512))
+
+    def test_limit_adaptive(self):
+        cmf = pFq(2, 1, sp.Integer(-1))
+        symbols = list(cmf.matrices.keys())
+        walker = CompiledWalker(cmf.trajectory_matrix(
+            trajectory=Position([1, 1, 2], symbols), start=Position([1, 1, 2], symbols)
+        ))
+        limits = walker.limit_adaptive(50, 5000)
+        self.assertEqual([100, 200], list(limits))
+        self.assertEqual(walker.limit([100, 200]), list(limits.values()))
+        self.assertEqual([100, 150], list(walker.limit_adaptive(500, 150)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,5 @@
-from dataclasses import dataclass, fields
+from dataclasses import dataclass, field, fields
+from typing import List
 
 from .configurable import Configurable
 
@@ -17,10 +18,16 @@ class AnalysisConfig(Configurable):
     PARALLEL_SHARD_EXTRACTION: bool = False
     SHARD_VALIDATION_CHUNK: int = 300
     HP_CALC_CHUNK: int = 10
+    USE_KNOWN_HYPERPLANES: bool = True      # use the CMF family's analytic hyperplanes when available (e.g. pFq)
+    SHARD_ENUMERATION: str = 'incremental'  # 'incremental' (split cells plane by plane) / 'dfs' / 'exhaustive'
+    SHARD_DFS_SUBTREES: int = 64            # minimal number of subtrees to farm out to the pool in 'dfs' enumeration
+    USE_SHARD_CACHE: bool = True                    # load and store the shards of each CMF + shift on disk
+    SHARD_CACHE_PATH: str = './shard_cache.db'
 
     NUM_TRAJECTORIES_FROM_DIM: callable = (lambda dim: 10 ** dim)     # #trajectories to analyze given searchable dims
     IDENTIFY_THRESHOLD: float = -1  # consider a shard as related to a constant: threshold > identified_trajectories(%)
     MAX_EXPANSIONS: int = 3         # Times to expand search for start points beyond the 3 by 3 cube around the origin
+    START_POINT_METHOD: str = 'chebyshev'   # 'chebyshev' (round each shard's center to the lattice) / 'cube' / 'sphere'
 
     # ============================= Printing and error management =============================
     PRINT_SHARDS: bool = True
@@ -33,6 +40,8 @@ class AnalysisConfig(Configurable):
     ANALYZE_LIMIT: bool = False             # calculate the limit
     ANALYZE_EIGEN_VALUES: bool = False      # calculate the trajectory matrix eigen values
     ANALYZE_GCD_SLOPE: bool = False         # calculate the gcd slope of the trajectory
+    WALK_DEPTHS: List[int] = field(default_factory=lambda: [25, 50, 100])   # shallow checkpoints to fit deltas from
+    MIN_DELTA_CONFIDENCE: float = 0.5       # rank shards by deltas fitted with at least this confidence (if any)
 
 
 analysis_config: AnalysisConfig = AnalysisConfig()
@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import List, Optional
 
 from .configurable import Configurable
 
@@ -7,8 +8,35 @@ from .configurable import Configurable
 class SearchConfig(Configurable):
     PARALLEL_SEARCH: bool = True
     SEARCH_VECTOR_CHUNK: int = 4                # number of search vectors per chunk for parallel search
-    PARALLEL_TRAJECTORY_MATCHING: bool = False  # preform parallel trajectory finding for each shard
     WARN_ON_EMPTY_SHARDS: bool = False          # warn user if start points could not be found in the shards
+    RANDOM_SEED: Optional[int] = None           # seed for randomly sampled trajectories and start points
+    LOW_DISCREPANCY_SAMPLING: bool = False      # sample randomly using a scrambled Sobol sequence
+    TRAJECTORY_STREAM_CHUNK: int = 1024         # number of trajectories consumed at once by a streamed search
+    TRAJECTORY_STREAM_PATIENCE: int = 16        # a streamed search stops after this many consecutive chunks without
+                                                #   a new valid search vector (e.g. in a bounded shard)
+    SEARCH_BUDGET: Optional[int] = None         # maximal number of search vectors computed by a streamed search
+    TARGET_DELTA: Optional[float] = None        # a streamed search stops once a delta this large is found
+    USE_SYMMETRIES: bool = True                 # walk one search vector per orbit of the CMF's symmetries
+    WALK_BACKEND: str = 'compiled'              # 'compiled' (integer polynomial evaluators), 'product_tree'
+                                                #   (compiled, multiplied by binary splitting for deep walks) or 'sympy'
+    WALK_DEPTHS: List[int] = field(default_factory=lambda: [100, 500, 2000])    # depths the walk is checkpointed at,
+                                                                                #   the limit is taken at the deepest
+    DELTA_DEPTHS: List[int] = field(default_factory=lambda: [25, 50, 100])  # depths the walk is checkpointed at
+                                                                            #   when the limit is not required
+    IDENTIFY_DEPTH: int = 100                   # depth of the convergents passed to LIReC (always checkpointed)
+    ADAPTIVE_DEPTH: bool = False                # walk in doubling stages until the convergents agree (compiled walks)
+    ADAPTIVE_DIGITS: int = 50                   # digits successive stages must agree to before the walk stops
+    ADAPTIVE_MIN_DEPTH: int = 100               # depth of the first stage
+    ADAPTIVE_WORK: int = 20000                  # maximal adaptive depth times the L1 norm of the trajectory
+    MODULAR_SCREEN: bool = True                 # reject degenerate walks modulo word sized primes before walking
+    FLOAT_SCREEN: bool = True                   # walk batches of search vectors in float64 and drop the useless ones
+    FLOAT_SCREEN_BATCH: int = 64                # number of search vectors screened together
+    FLOAT_SCREEN_DEPTH: int = 512               # depth of the float64 walks
+    FLOAT_SCREEN_TOL: float = 1e-12             # relative difference of the float limits considered converged
+    FLOAT_SCREEN_RATIONAL: bool = False         # also drop walks whose p/q converges to a small-denominator rational
+    PRINT_SCREEN_STATS: bool = True             # report the number of search vectors rejected by the float screen
+    EXTRAPOLATE_DELTA: bool = True              # fit the delta over all the depths instead of taking the deepest one
+    DELTA_CONFIDENCE_SCALE: float = 0.05        # spread of the fitted delta at which its confidence is 1/2
 
 
 search_config: SearchConfig = SearchConfig()
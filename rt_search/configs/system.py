@@ -15,8 +15,16 @@ class SystemConfig(Configurable):
     TQDM_CONFIG: Dict[str, Any] = field(default_factory=dict)
     LOGGING_BUFFER_SIZE: int = 150  # when logging a buffer use width of terminal as 150 characters
 
+    # ============================== Parallelism ==============================
+    POOL_MAX_WORKERS: Optional[int] = None                          # workers in the shared process pool (None = #CPUs)
+    POOL_RECYCLE_TASKS: int = 10000                                 # recycle the pool's workers after this many tasks
+
     # ============================== constant mapping ==============================
     SYMPY_TO_MPMATH: Dict[str, mp] = field(default_factory=dict)
+    MAX_WORKING_DIGITS: int = 30000                                 # maximal precision a task may escalate to
+    CONSTANTS_SHARED_DIGITS: int = 2048                             # precision of the constants shared with workers
+    USE_CONSTANTS_CACHE: bool = True                                # store computed constants on disk
+    CONSTANTS_CACHE_PATH: str = './constants_cache.db'
 
     def __post_init__(self):
         self.TQDM_CONFIG = {
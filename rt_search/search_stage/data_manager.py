@@ -21,6 +21,25 @@ class SearchVector(exp.JSONExportable, imp.JSONImportable):
     def __hash__(self):
         return hash((self.start, self.trajectory))
 
+    def canonical(self, symmetries: List[Tuple[sp.Symbol, ...]]) -> "SearchVector":
+        """
+        Find the canonical representative of the search vector's orbit under permutations of interchangeable symbols.
+        Within each block the (start, trajectory) coordinate pairs are sorted, so equivalent search vectors share the
+        same representative.
+        :param symmetries: Blocks of interchangeable symbols (see CMF.symmetries())
+        :return: The canonical search vector
+        """
+        start, trajectory = dict(self.start), dict(self.trajectory)
+        for block in symmetries:
+            pairs = sorted((self.start[sym], self.trajectory[sym]) for sym in block)
+            for sym, (s, t) in zip(block, pairs):
+                start[sym], trajectory[sym] = s, t
+        symbols = list(self.start.keys())
+        return SearchVector(
+            Position([start[sym] for sym in symbols], symbols),
+            Position([trajectory[sym] for sym in symbols], symbols)
+        )
+
     def to_json_obj(self):
         return {'start': self.start.to_json_obj(), 'trajectory': self.trajectory.to_json_obj()}
 
@@ -37,22 +56,30 @@ class SearchData(exp.JSONExportable):
 
     sv: SearchVector
     limit: float = None
+    depth: int | None = None
     delta: float | str = None
+    delta_confidence: float | None = None
     eigen_values: Dict = field(default_factory=dict)
     gcd_slope: float | None = None
     initial_values: Matrix = None
     LIReC_identify: bool = False
+    depth_limits: Dict[int, float] = field(default_factory=dict)
+    depth_deltas: Dict[int, float] = field(default_factory=dict)
     errors: Dict[str, Exception | None] = field(default_factory=dict)
 
     def to_json_obj(self):
         return {
             'sv': self.sv.to_json_obj(),
             'limit': self.limit,
+            'depth': self.depth,
             'delta': self.delta,
+            'delta_confidence': self.delta_confidence,
             'eigen_values': self.eigen_values,
             'gcd_slope': self.gcd_slope,
             'initial_values': self.initial_values.tolist(),
-            'LIReC_identify': self.LIReC_identify
+            'LIReC_identify': self.LIReC_identify,
+            'depth_limits': self.depth_limits,
+            'depth_deltas': self.depth_deltas
             # 'errors': str(self.errors) # TODO: deal with saving errors
         }
 
@@ -98,6 +125,24 @@ class DataManager(UserDict[SearchVector, SearchData], exp.JSONExportable):
         row = df.loc[deltas.idxmax()]
         return row['delta'], row['sv']
 
+    def best_confident_delta(self, min_confidence: float) -> Tuple[Optional[float], Optional[SearchVector]]:
+        """
+        The best delta found among the deltas estimated with enough confidence
+        :param min_confidence: The minimal confidence of the delta estimates considered
+        :return: A tuple of the delta value and the search vector it was found in.
+        """
+        df = self.as_df()
+        if df.empty:
+            return None, None
+
+        confident = df[df['delta_confidence'].fillna(0) >= min_confidence]
+        deltas = confident['delta'].dropna()
+        if deltas.empty:
+            return None, None
+
+        row = df.loc[deltas.idxmax()]
+        return row['delta'], row['sv']
+
     def get_data(self) -> List[SearchData]:
         """
         Gather all search data in the manager into a list
@@ -114,11 +159,15 @@ class DataManager(UserDict[SearchVector, SearchData], exp.JSONExportable):
             {
                 "sv": sv,
                 "delta": data.delta,
+                "delta_confidence": data.delta_confidence,
                 "limit": data.limit,
+                "depth": data.depth,
                 "eigen_values": data.eigen_values,
                 "gcd_slope": data.gcd_slope,
                 "initial_values": data.initial_values,
                 "LIReC_identify": data.LIReC_identify,
+                "depth_limits": data.depth_limits,
+                "depth_deltas": data.depth_deltas,
                 "errors": data.errors,
             }
             for sv, data in self.items()
@@ -130,11 +179,15 @@ class DataManager(UserDict[SearchVector, SearchData], exp.JSONExportable):
             {
                 "sv": sv.to_json_obj(),
                 "delta": data.delta,
+                "delta_confidence": data.delta_confidence,
                 "limit": data.limit,
+                "depth": data.depth,
                 "eigen_values":  {str(k): str(v) for k, v in data.eigen_values.items()} if data.eigen_values else None,
                 "gcd_slope": data.gcd_slope,
                 "initial_values": str(data.initial_values.tolist()) if data.initial_values else None,
                 "LIReC_identify": data.LIReC_identify,
+                "depth_limits": {str(k): v for k, v in data.depth_limits.items()},
+                "depth_deltas": {str(k): v for k, v in data.depth_deltas.items()},
                 "errors": [{'where': where, 'type': type(error).__name__, 'msg': str(error)} for where, error in data.errors.items()]
             }
             for sv, data in self.items()
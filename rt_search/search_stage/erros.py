@@ -1,3 +1,5 @@
 class ResultIgnored(Exception):
     default_msg = 'Result ignored. Cause: '
     cause_small_denom = 'delta denominator too small. Suspected as no convergence trajectory.'
+    cause_degenerate_walk = 'degenerate walk in the modular screen: '
+    cause_float_screen = 'rejected by the float screen: '
@@ -8,15 +8,21 @@ from ...erros import *
 from rt_search.utils.types import *
 from rt_search.utils.geometry.point_generator import PointGenerator
 from rt_search.utils.logger import Logger
+from rt_search.utils.pool import PoolManager
+from rt_search.utils.walker import CompiledWalker
+from rt_search.utils.convergence import convergent_errors, extrapolate_delta
+from rt_search.utils.precision import WorkingPrecision
 from rt_search.configs import search_config
-from rt_search.system.system import System
+from rt_search.system.constants import ConstantRegistry
+from rt_search.system.errors import UnknownConstant
 
 import sympy as sp
 import mpmath as mp
+import numpy as np
 from LIReC.db.access import db
-from concurrent.futures import ProcessPoolExecutor
 from functools import partial
-from ramanujantools import matrix as rtm
+from collections import Counter
+from ramanujantools import matrix as rtm, Limit
 
 
 class SerialSearcher(SearchMethod):
@@ -40,21 +46,34 @@ class SerialSearcher(SearchMethod):
         self.trajectories: Set[Position] = set()
         self.data_manager = data_manager if data_manager else DataManager(use_LIReC)
         self.const_name = space.const_name
-        self.parallel = ((not self.deep_search and search_config.PARALLEL_TRAJECTORY_MATCHING)
-                         or search_config.PARALLEL_SEARCH)
-        self.pool = ProcessPoolExecutor() if self.parallel else None
+        self.parallel = search_config.PARALLEL_SEARCH
+        self.screen_stats: Counter = Counter()
 
     def generate_trajectories(self,
                               method: str,
                               length: int,
                               n: Optional[int] = None,
                               clear=True):
+        """
+        Generate the trajectories to search along (only the ones valid in the space are kept)
+        :param method: The shape of the trajectories (cube / sphere), or 'cone' for trajectories built directly inside
+            the recession cone of the space
+        :param length: The side length or radius length of the shape
+        :param n: Amount of trajectories to sample randomly. For 'cone' - the maximal number of trajectories (the
+            shortest within the radius length are kept), defaults to all of them
+        :param clear: Discard the previously generated trajectories
+        """
         random = n is not None
         if clear:
             self.trajectories.clear()
 
-        if random:
-            trajectories = PointGenerator.generate_via_shape(length, self.space.dim, method, True, random, n)
+        if method == 'cone':
+            trajectories = self.space.tg.get_cone_trajectories(self.space, length, n)
+        elif random:
+            trajectories = PointGenerator.generate_via_shape_array(
+                length, self.space.dim, method, True, random, n,
+                seed=search_config.RANDOM_SEED, low_discrepancy=search_config.LOW_DISCREPANCY_SAMPLING
+            )
         else:
             trajectories = self.space.tg.get_trajectories(method, length, True)
 
@@ -66,13 +85,8 @@ class SerialSearcher(SearchMethod):
             ).log(msg_prefix='\n')
             return
 
-        trajectories = {Position(t, self.space.symbols) for t in trajectories}
-
-        if not self.deep_search and search_config.PARALLEL_TRAJECTORY_MATCHING:
-            res = self.pool.map(partial(self.space.trajectory_in_space, start=arbitrary_start), trajectories, chunksize=200)
-            self.trajectories.update({t for valid, t in zip(res, trajectories) if valid})
-        else:
-            self.trajectories.update({t for t in trajectories if self.space.trajectory_in_space(t, arbitrary_start)})
+        valid = self.space.trajectories_in_space(arbitrary_start, trajectories)
+        self.trajectories.update(Position(t, self.space.symbols) for t in trajectories[valid].tolist())
 
     def generate_start_points(self,
                               method: str,
@@ -81,7 +95,10 @@ class SerialSearcher(SearchMethod):
         random = n is not None
         starts = [
             Position(s, self.space.symbols) for s in
-            PointGenerator.generate_via_shape(length, self.space.dim, method, False, random, n)
+            PointGenerator.generate_via_shape(
+                length, self.space.dim, method, False, random, n,
+                seed=search_config.RANDOM_SEED, low_discrepancy=search_config.LOW_DISCREPANCY_SAMPLING
+            )
             if self.space.in_space(Position(s, self.space.symbols))[0]
         ]
         self.space.add_start_points(starts, filtering=True)
@@ -93,13 +110,15 @@ class SerialSearcher(SearchMethod):
                        parallel: bool = False,
                        find_limit: bool = True,
                        find_eigen_values: bool = True,
-                       find_gcd_slope: bool = True
+                       find_gcd_slope: bool = True,
+                       depths: Optional[List[int]] = None,
+                       traj_m: Optional[Matrix] = None,
+                       walker: Optional[CompiledWalker] = None
                        ):
-        def h_calc_walk_values(traj_m) -> Tuple[List, Exception | None]:
+        def h_calc_walk_values(walked) -> Tuple[List, Exception | None]:
             values = None
             error = None
             try:
-                walked = traj_m.walk({n: 1}, 100, {n: 0})
                 walked = walked.inv().T
                 t1_col = (walked / walked[0, 0]).col(0)
                 values = [v for v in t1_col[1:]]
@@ -125,21 +144,42 @@ class SerialSearcher(SearchMethod):
             finally:
                 return simpified, error
 
-        def h_calc_delta(estimated, constant: str):
+        def h_calc_delta(convergents: Dict[int, sp.Rational], constant: str, precision: WorkingPrecision):
             delta = None
+            confidence = None
+            depth_deltas = {}
             error = None
             try:
-                error_v = sp.Abs(estimated - System.get_const_as_sp(constant).evalf(30000))
-                denom = sp.denom(estimated)
+                denom = sp.denom(convergents[max(convergents)])
                 if denom == 1:
                     raise ZeroDivisionError('Denominator 1 caused zero division in delta calculation')
                 if denom < 100:
                     raise ResultIgnored(ResultIgnored.default_msg + ResultIgnored.cause_small_denom)
-                delta = -1 - sp.log(error_v) / sp.log(denom)
+                # escalate until every error is resolved with at least the guard digits
+                depths, log_errors, log_denoms = precision.run(
+                    lambda: convergent_errors(convergents, ConstantRegistry.get(constant)),
+                    lambda res: all(
+                        e == float('-inf') or e > -(mp.mp.dps - WorkingPrecision.GUARD_DIGITS) * np.log(10)
+                        for e in res[1]
+                    )
+                )
+                depth_deltas = {d: -1 - e / q for d, e, q in zip(depths, log_errors, log_denoms) if q > 0}
+                delta = depth_deltas[depths[-1]]
+                if search_config.EXTRAPOLATE_DELTA:
+                    extrapolated, confidence = extrapolate_delta(
+                        depths, log_errors, log_denoms, search_config.DELTA_CONFIDENCE_SCALE
+                    )
+                    # no finite error to fit (e.g. exact convergents) - keep the pointwise delta (inf)
+                    delta = delta if extrapolated is None else extrapolated
             except Exception as e:
                 error = e
             finally:
-                return delta, error
+                return delta, confidence, depth_deltas, error
+
+        def h_walk(depths: List[int]) -> Dict[int, Limit]:
+            if walker is not None:
+                return dict(zip(depths, walker.limit(depths)))
+            return dict(zip(depths, traj_m.limit({n: 1}, depths, {n: 0})))
 
         n = sp.symbols('n')
         start, t = sv
@@ -148,18 +188,63 @@ class SerialSearcher(SearchMethod):
         sd = SearchData(sv)
 
         try:
-            traj_m = cmf.trajectory_matrix(
-                trajectory=t,
-                start=start
-            )
+            if traj_m is None:
+                traj_m = cmf.trajectory_matrix(
+                    trajectory=t,
+                    start=start
+                )
         except Exception as e:
             Logger(f'Could not compute trajectory matrix for start={start}, trajectory={t}', Logger.Levels.warning).log(msg_prefix='\n')
             sd.errors['traj_mat'] = e
             return sd
+
+        if depths is None:
+            # without the limit, the walk only needs to reach the depths of the delta fit
+            depths = search_config.WALK_DEPTHS if find_limit else search_config.DELTA_DEPTHS
+        depths = sorted(set(depths) | ({search_config.IDENTIFY_DEPTH} if use_LIReC else set()))
+        if walker is None and search_config.WALK_BACKEND in ('compiled', 'product_tree'):
+            try:
+                walker = CompiledWalker(traj_m, product_tree=search_config.WALK_BACKEND == 'product_tree')
+            except ValueError:
+                pass    # not a univariate matrix - fall back to the sympy walk
+        # adaptive walks spend a budget of steps normalized by the trajectory's norm
+        adaptive = walker is not None and search_config.ADAPTIVE_DEPTH
+        if adaptive:
+            norm = max(1, sum(abs(v) for v in t.values()))
+            max_depth = max(search_config.ADAPTIVE_MIN_DEPTH, search_config.ADAPTIVE_WORK // norm)
+        if walker is not None and search_config.MODULAR_SCREEN:
+            cause = walker.screen(max_depth if adaptive else max(depths))
+            if cause is not None:
+                ignored = ResultIgnored(ResultIgnored.default_msg + ResultIgnored.cause_degenerate_walk + cause)
+                sd.errors['delta'] = ignored
+                sd.errors['initial_values'] = ignored
+                return sd
+
+        # a single walk checkpointed at all depths (or at its adaptive stages) - the limit is taken at the deepest one
         try:
+            if adaptive:
+                limits = walker.limit_adaptive(
+                    search_config.ADAPTIVE_DIGITS, max_depth, search_config.ADAPTIVE_MIN_DEPTH
+                )
+                sd.depth = max(limits)
+                if use_LIReC and search_config.IDENTIFY_DEPTH not in limits:
+                    limits[search_config.IDENTIFY_DEPTH] = walker.limit(search_config.IDENTIFY_DEPTH)
+                    limits = dict(sorted(limits.items()))
+            else:
+                try:
+                    limits = h_walk(depths)
+                except Exception as e:
+                    # LIReC identifies the convergents at IDENTIFY_DEPTH, which the deeper checkpoints do not affect
+                    shallow = [depth for depth in depths if depth <= search_config.IDENTIFY_DEPTH] if use_LIReC else []
+                    if not shallow or len(shallow) == len(depths):
+                        raise
+                    sd.errors['limit'] = e
+                    limits = h_walk(shallow)
+                sd.depth = max(limits)
+            limit = limits[sd.depth]
             if find_limit:
-                limit = traj_m.limit({n: 1}, 2000, {n: 0})
                 sd.limit = float(limit.as_float())
+                sd.depth_limits = {depth: float(lim.as_float()) for depth, lim in limits.items()}
         except Exception as e:
             # TODO: add trace logging to some log file
             Logger(
@@ -178,41 +263,44 @@ class SerialSearcher(SearchMethod):
 
         try:
             if find_gcd_slope:
-                sd.gcd_slope = traj_m.gcd_slope()
+                sd.gcd_slope = walker.gcd_slope() if walker else traj_m.gcd_slope()
                 sd.gcd_slope = float(sd.gcd_slope) if parallel else sd.gcd_slope
         except Exception as e:
             sd.errors['gcd_slope'] = e
 
-        mp.mp.dps = 400
+        # the working precision follows the digits the walk resolves instead of a fixed global precision
+        precision = WorkingPrecision.for_limit(limit)
 
         if not use_LIReC:
+            delta, sd.delta_confidence, sd.depth_deltas, error = h_calc_delta(
+                {depth: lim.as_rational() for depth, lim in limits.items()}, constant, precision
+            )
+            if error is not None:
+                sd.errors['delta'] = error
+            else:
+                sd.delta = delta
             try:
-                sd.delta = limit.delta(System.get_const_as_sp(constant))
-                if sd.delta in (mp.mpf("inf"), mp.mpf("-inf")) and parallel:  # TODO: delta is a float!
-                    sd.delta = str(sd.delta)
-            except Exception as e:
-                sd.errors['delta'] = e
-            try:
-                sd.initial_values = limit.identify(System.get_const_as_mpf(constant))
+                with precision:
+                    sd.initial_values = limit.identify(ConstantRegistry.get(constant))
             except Exception as e:
                 sd.errors['initial_values'] = e
             finally:
                 return sd
 
-        values, error = h_calc_walk_values(traj_m)
+        values, error = h_calc_walk_values(limits[search_config.IDENTIFY_DEPTH].current)
         if error is not None:
             sd.errors['delta'] = error
             sd.errors['initial_values'] = error
             return sd
 
         try:
-            const = System.get_const_as_sp(constant)
-            evalf = getattr(const, 'evalf')
+            with WorkingPrecision.for_limit(limits[search_config.IDENTIFY_DEPTH]):
+                const = sp.Float(ConstantRegistry.get(constant), mp.mp.dps)
+                simpified, error = h_identify([const] + values)
         except Exception as e:
-            sd.errors['delta'] = error
-            sd.errors['initial_values'] = error
+            sd.errors['delta'] = e
+            sd.errors['initial_values'] = e
             return sd
-        simpified, error = h_identify([System.get_const_as_sp(constant).evalf(300)] + values)
         if error is not None:
             sd.errors['delta'] = error
             sd.errors['initial_values'] = error
@@ -220,38 +308,85 @@ class SerialSearcher(SearchMethod):
 
         sd.LIReC_identify = True
         symbols = sp.symbols(f'c:{len(values) + 1}')[1:]
-        estimated = simpified.subs({sym: val for sym, val in zip(symbols, values)})
-        delta, error = h_calc_delta(estimated, constant)
+        # the relation identified at IDENTIFY_DEPTH is evaluated on the convergents of every checkpoint
+        convergents = {}
+        for depth, lim in limits.items():
+            depth_values = values if depth == search_config.IDENTIFY_DEPTH else h_calc_walk_values(lim.current)[0]
+            if depth_values is not None:
+                convergents[depth] = simpified.subs({sym: val for sym, val in zip(symbols, depth_values)})
+        delta, sd.delta_confidence, sd.depth_deltas, error = h_calc_delta(convergents, constant, precision)
         if error is not None:
             sd.errors['delta'] = error
         else:
-            d = SerialSearcher.sympy_to_mpmath(delta)
-            if d == mp.mpf("inf"):
-                print(f'delta: {d} in trajectory: {sv}')
-            sd.delta = float(SerialSearcher.sympy_to_mpmath(delta))
+            if delta == float('inf'):
+                print(f'delta: {delta} in trajectory: {sv}')
+            sd.delta = delta
 
         a, b = SerialSearcher.fraction_to_vectors(sp.fraction(simpified), symbols)
         sd.initial_values = rtm.Matrix([a, b])
         return sd
 
+    @staticmethod
+    def _search_batch(pairs: List[Tuple[Position, Position]],
+                      cmf: CMF, constant: str,
+                      use_LIReC: bool,
+                      parallel: bool = False,
+                      find_limit: bool = True,
+                      find_eigen_values: bool = True,
+                      find_gcd_slope: bool = True,
+                      depths: Optional[List[int]] = None
+                      ) -> Tuple[List[Optional[SearchData]], Dict[str, int]]:
+        """
+        Search a batch of (start, trajectory) pairs, screening all of them together in float64 first
+        (see CompiledWalker.float_screen). Only the pairs which pass the screen reach the exact walk and identification.
+        :return: The search data of each pair (None if ignored) and the number of pairs screened and rejected by
+            each cause
+        """
+        prepared = []
+        for start, t in pairs:
+            try:
+                traj_m = cmf.trajectory_matrix(trajectory=t, start=start)
+                walker = CompiledWalker(traj_m, product_tree=search_config.WALK_BACKEND == 'product_tree')
+            except Exception:
+                traj_m, walker = None, None     # the search worker reports the failure
+            prepared.append((traj_m, walker))
+
+        screened = [i for i, (_, walker) in enumerate(prepared) if walker is not None]
+        causes = dict(zip(screened, CompiledWalker.float_screen(
+            [prepared[i][1] for i in screened], search_config.FLOAT_SCREEN_DEPTH, search_config.FLOAT_SCREEN_TOL,
+            search_config.FLOAT_SCREEN_RATIONAL
+        )))
+
+        results = []
+        stats = {'screened': len(screened)}
+        for i, (pair, (traj_m, walker)) in enumerate(zip(pairs, prepared)):
+            cause = causes.get(i)
+            if cause is None:
+                results.append(SerialSearcher._search_worker(
+                    pair, cmf, constant, use_LIReC, parallel, find_limit, find_eigen_values, find_gcd_slope, depths,
+                    traj_m=traj_m, walker=walker
+                ))
+                continue
+            stats[cause] = stats.get(cause, 0) + 1
+            sd = SearchData(SearchVector(*pair))
+            ignored = ResultIgnored(ResultIgnored.default_msg + ResultIgnored.cause_float_screen + cause)
+            sd.errors['delta'] = ignored
+            sd.errors['initial_values'] = ignored
+            results.append(sd)
+        return results, stats
+
     def search(self,
                starts: Optional[Position | List[Position]] = None,
                partial_search_factor: float = 1,
                find_limit: bool = True,
                find_eigen_values: bool = True,
-               find_gcd_slope: bool = True) -> DataManager:
+               find_gcd_slope: bool = True,
+               depths: Optional[List[int]] = None) -> DataManager:
         if partial_search_factor > 1 or partial_search_factor < 0:
             raise ValueError("partial_search_factor must be between 0 and 1")
-        if not starts:
-            starts = self.space.choose_start_point()
-            if starts is None:
-                Logger(
-                    f'Could not provide a valid start point automatically', Logger.Levels.warning,
-                    condition=search_config.WARN_ON_EMPTY_SHARDS
-                ).log()
-                return DataManager(self.use_LIReC)
-        if isinstance(starts, Position):
-            starts = [starts]
+        starts = self.__resolve_starts(starts)
+        if starts is None:
+            return DataManager(self.use_LIReC)
 
         trajectories = self.trajectories
         if partial_search_factor < 1:
@@ -265,35 +400,163 @@ class SerialSearcher(SearchMethod):
 
         pairs = [(start, t) for start in starts for t in trajectories if
                  SearchVector(start, t) not in self.data_manager]
+        self.__search_pairs(pairs, find_limit, find_eigen_values, find_gcd_slope, depths)
+        return self.data_manager
+
+    def search_stream(self,
+                      starts: Optional[Position | List[Position]] = None,
+                      budget: Optional[int] = None,
+                      target_delta: Optional[float] = None,
+                      max_radius: Optional[int | sp.Rational] = None,
+                      find_limit: bool = True,
+                      find_eigen_values: bool = True,
+                      find_gcd_slope: bool = True,
+                      depths: Optional[List[int]] = None) -> DataManager:
+        """
+        Search along primitive trajectories streamed in increasing norm instead of generating them all upfront. \n
+        The trajectories are consumed in chunks of search_config.TRAJECTORY_STREAM_CHUNK until the budget is used, the
+        target delta is reached or the trajectories up to max_radius are exhausted (at least one of the budget and
+        max_radius must be set). Since a space may hold fewer valid trajectories than the budget (e.g. a bounded shard),
+        the stream also stops after search_config.TRAJECTORY_STREAM_PATIENCE consecutive chunks without a new one.
+        :param starts: The start points to search from (chosen automatically if not given)
+        :param budget: The maximal number of search vectors to compute, defaults to search_config.SEARCH_BUDGET
+        :param target_delta: Stop once a delta at least this large is found, defaults to search_config.TARGET_DELTA
+        :param max_radius: Stop after the trajectories of this norm
+        :param find_limit: Compute the limit of each search vector
+        :param find_eigen_values: Compute the eigenvalues of each trajectory matrix
+        :param find_gcd_slope: Compute the gcd slope of each search vector
+        :param depths: The depths to checkpoint the walks at, defaults to search_config.WALK_DEPTHS
+            (search_config.DELTA_DEPTHS if the limit is not required)
+        :return: The data manager holding the results
+        """
+        budget = search_config.SEARCH_BUDGET if budget is None else budget
+        target_delta = search_config.TARGET_DELTA if target_delta is None else target_delta
+        if budget is None and max_radius is None:
+            raise ValueError('A trajectory stream must be bounded by a budget or a maximal radius')
+        starts = self.__resolve_starts(starts)
+        if starts is None:
+            return DataManager(self.use_LIReC)
+
+        computed = 0
+        idle = 0
+        chunks = PointGenerator.iter_shells(self.space.dim, True, search_config.TRAJECTORY_STREAM_CHUNK, max_radius)
+        for chunk in chunks:
+            pairs = []
+            for start in starts:
+                valid = self.space.trajectories_in_space(start, chunk)
+                pairs += [
+                    (start, t) for t in (Position(t, self.space.symbols) for t in chunk[valid].tolist())
+                    if SearchVector(start, t) not in self.data_manager
+                ]
+            if budget is not None:
+                pairs = pairs[:budget - computed]
+            if not pairs:
+                idle += 1
+                if idle >= search_config.TRAJECTORY_STREAM_PATIENCE:
+                    break
+                continue
+            idle = 0
+
+            results = self.__search_pairs(pairs, find_limit, find_eigen_values, find_gcd_slope, depths)
+            computed += len(pairs)
+            if budget is not None and computed >= budget:
+                break
+            deltas = [sd.delta for sd in results if sd and isinstance(sd.delta, (int, float, mp.mpf))]
+            if target_delta is not None and deltas and max(deltas) >= target_delta:
+                break
+        return self.data_manager
+
+    def __resolve_starts(self, starts: Optional[Position | List[Position]]) -> Optional[List[Position]]:
+        """
+        :param starts: The start points given to a search
+        :return: The start points as a list (chosen automatically if not given), None if no start point is available
+        """
+        if not starts:
+            starts = self.space.choose_start_point()
+            if starts is None:
+                Logger(
+                    f'Could not provide a valid start point automatically', Logger.Levels.warning,
+                    condition=search_config.WARN_ON_EMPTY_SHARDS
+                ).log()
+                return None
+        if isinstance(starts, Position):
+            starts = [starts]
+        return starts
+
+    def __search_pairs(self,
+                       pairs: List[Tuple[Position, Position]],
+                       find_limit: bool,
+                       find_eigen_values: bool,
+                       find_gcd_slope: bool,
+                       depths: Optional[List[int]] = None) -> List[SearchData]:
+        """
+        Compute the search data of (start, trajectory) pairs and store it in the data manager
+        :param pairs: The pairs to search
+        :param find_limit: Compute the limit of each search vector
+        :param find_eigen_values: Compute the eigenvalues of each trajectory matrix
+        :param find_gcd_slope: Compute the gcd slope of each search vector
+        :param depths: The depths to checkpoint the walks at, defaults to search_config.WALK_DEPTHS
+            (search_config.DELTA_DEPTHS if the limit is not required)
+        :return: The search data computed
+        """
+        # walk a single representative of each orbit of equivalent search vectors
+        orbits = {}
+        symmetries = self.space.cmf.symmetries() if search_config.USE_SYMMETRIES else []
+        for start, t in pairs:
+            key = SearchVector(start, t).canonical(symmetries) if symmetries else SearchVector(start, t)
+            orbits.setdefault(key, []).append(SearchVector(start, t))
+        pairs = [(orbit[0].start, orbit[0].trajectory) for orbit in orbits.values()]
+
+        if self.parallel:
+            # compute the constant once, instead of once per worker (and per precision escalation)
+            try:
+                ConstantRegistry.share([self.const_name])
+            except UnknownConstant:
+                pass
+        kwargs = dict(
+            cmf=self.space.cmf,
+            constant=self.const_name,
+            use_LIReC=self.use_LIReC,
+            parallel=self.parallel,
+            find_limit=find_limit,
+            find_eigen_values=find_eigen_values,
+            find_gcd_slope=find_gcd_slope,
+            depths=depths
+        )
+        if search_config.FLOAT_SCREEN and search_config.WALK_BACKEND != 'sympy':
+            size = search_config.FLOAT_SCREEN_BATCH
+            batches = [pairs[i:i + size] for i in range(0, len(pairs), size)]
+            worker = partial(self._search_batch, **kwargs)
+            outputs = PoolManager.map(worker, batches) if self.parallel else [worker(batch) for batch in batches]
+            results = [res for batch_results, _ in outputs for res in batch_results]
+            stats = Counter()
+            for _, batch_stats in outputs:
+                stats.update(batch_stats)
+            self.__report_screen(stats)
+        elif self.parallel:
+            results = PoolManager.map(
+                partial(self._search_worker, **kwargs), pairs, chunksize=search_config.SEARCH_VECTOR_CHUNK
+            )
+        else:
+            results = [self._search_worker(pair, **kwargs) for pair in pairs]
 
         if self.parallel:
-            results = self.pool.map(
-                partial(
-                    self._search_worker,
-                    cmf=self.space.cmf,
-                    constant=self.const_name,
-                    use_LIReC=self.use_LIReC,
-                    parallel=True,
-                    find_limit=find_limit,
-                    find_eigen_values=find_eigen_values,
-                    find_gcd_slope=find_gcd_slope
-                ),
-                pairs, chunksize=search_config.SEARCH_VECTOR_CHUNK)
             for res in results:
                 if res:
                     res.gcd_slope = mp.mpf(res.gcd_slope) if res.gcd_slope else None
                     res.delta = mp.mpf(res.delta) if isinstance(res.delta, str) else res.delta
-                    self.data_manager[res.sv] = res
-        else:
-            for start, t in pairs:
-                sd = self._search_worker(
-                    (start, t), self.space.cmf, self.const_name, self.use_LIReC,
-                    find_limit=find_limit,
-                    find_eigen_values=find_eigen_values,
-                    find_gcd_slope=find_gcd_slope
-                )
-                self.data_manager[sd.sv] = sd
-        return self.data_manager
+
+        # fan the results out to the whole orbits
+        computed = []
+        for orbit, res in zip(orbits.values(), results):
+            if not res:
+                continue
+            for sv in orbit:
+                sd = res if sv == res.sv else copy.copy(res)
+                sd.sv = sv
+                self.data_manager[sv] = sd
+                computed.append(sd)
+        return computed
 
     def get_data(self):
         """
@@ -307,6 +570,19 @@ class SerialSearcher(SearchMethod):
     def enrich_trajectories(self):
         raise NotImplementedError
 
+    def __report_screen(self, stats: Counter) -> None:
+        """
+        Accumulate the statistics of the float screen into self.screen_stats and report the rejections
+        :param stats: The number of pairs screened and rejected by each cause in the last search
+        """
+        self.screen_stats.update(stats)
+        screened = stats.pop('screened', 0)
+        Logger(
+            f'Float screen rejected {sum(stats.values())}/{screened} search vectors'
+            + (f' ({", ".join(f"{cause}: {count}" for cause, count in sorted(stats.items()))})' if stats else ''),
+            Logger.Levels.info, condition=search_config.PRINT_SCREEN_STATS and screened > 0
+        ).log(msg_prefix='\n')
+
     @staticmethod
     def sympy_to_mpmath(x):
         if x is sp.zoo:
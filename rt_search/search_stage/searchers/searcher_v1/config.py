@@ -2,3 +2,6 @@ FIND_EIGEN_VALUES = False
 FIND_GCD_SLOPE = False
 FIND_LIMIT = False
 NUM_OF_TRAJ_FROM_DIM = (lambda d: 10 ** d)
+TRAJECTORY_METHOD = 'sphere'    # 'sphere' or 'cone' (trajectories built inside each shard's recession cone)
+TRAJ_SAMPLE_SIZE = None     # if set, sample this many trajectories at random instead of enumerating them all
+STREAM_TRAJECTORIES = False     # consume trajectories in increasing norm up to NUM_OF_TRAJ_FROM_DIM search vectors
@@ -36,17 +36,26 @@ class SearcherModV1(SearcherModScheme):
         dms: Dict[Searchable, DataManager] = dict()
         for space in tqdm(self.searcahbles, desc='Searching the searchable spaces: ', **sys_config.TQDM_CONFIG):
             searcher = SerialSearcher(space, System.get_const_as_sp(space.const_name), use_LIReC=self.use_LIReC)
-            searcher.generate_trajectories(
-                'sphere',
-                PointGenerator.calc_sphere_radius(search_config.NUM_OF_TRAJ_FROM_DIM(space.dim), space.dim)
-            )
             start = space.choose_start_point()
-            res = searcher.search(
-                start, partial_search_factor=1,
-                find_limit=search_config.FIND_LIMIT,
-                find_gcd_slope=search_config.FIND_GCD_SLOPE,
-                find_eigen_values=search_config.FIND_EIGEN_VALUES
-            )
+            if search_config.STREAM_TRAJECTORIES:
+                res = searcher.search_stream(
+                    start, budget=search_config.NUM_OF_TRAJ_FROM_DIM(space.dim),
+                    find_limit=search_config.FIND_LIMIT,
+                    find_gcd_slope=search_config.FIND_GCD_SLOPE,
+                    find_eigen_values=search_config.FIND_EIGEN_VALUES
+                )
+            else:
+                searcher.generate_trajectories(
+                    search_config.TRAJECTORY_METHOD,
+                    PointGenerator.calc_sphere_radius(search_config.NUM_OF_TRAJ_FROM_DIM(space.dim), space.dim),
+                    n=search_config.TRAJ_SAMPLE_SIZE
+                )
+                res = searcher.search(
+                    start, partial_search_factor=1,
+                    find_limit=search_config.FIND_LIMIT,
+                    find_gcd_slope=search_config.FIND_GCD_SLOPE,
+                    find_eigen_values=search_config.FIND_EIGEN_VALUES
+                )
             q.put((space.const_name, space.cmf, res))
             dms[space] = res
         writer.stop_signal = True
@@ -0,0 +1,146 @@
+from .system import System
+from ..utils.types import *
+from ..utils.pool import PoolManager
+from ..utils.precision import WorkingPrecision
+from ..configs import sys_config
+
+import multiprocessing
+import mpmath as mp
+import sqlite3
+
+
+class ConstantRegistry:
+    """
+    High precision values of the constants, computed once per precision tier and shared by the whole system. \n
+    A request for d digits is served by the most precise value known. Otherwise, the constant is computed
+    (see System.get_const_as_mpf) at the tier above d - the smallest power of two which is at least d - so a growing
+    precision triggers only a logarithmic number of computations. The computed tiers are persisted in an SQLite store
+    (sys_config.CONSTANTS_CACHE_PATH) and installed in the workers of the shared pool by an initializer.
+    Only the main process writes to the store, and a store which cannot be used falls back to the values in memory.
+    """
+    MIN_TIER = 64
+    _values: Dict[str, Tuple[int, mp.mpf]] = {}
+    _shared: Dict[str, int] = {}
+
+    @staticmethod
+    def tier(digits: int) -> int:
+        """
+        :param digits: The number of digits required
+        :return: The precision tier serving them
+        """
+        tier = ConstantRegistry.MIN_TIER
+        while tier < digits:
+            tier *= 2
+        return max(min(tier, sys_config.MAX_WORKING_DIGITS), digits)
+
+    @classmethod
+    def get(cls, constant: str, digits: Optional[int] = None) -> mp.mpf:
+        """
+        Retrieve a constant with at least the required precision (computing it only if needed)
+        :param constant: Constant name as string
+        :param digits: The number of digits required, defaults to the current mpmath precision
+        :raise UnknownConstant if constant is unknown
+        :return: The constant as mp.mpf (it may carry more digits than required)
+        """
+        digits = mp.mp.dps if digits is None else digits
+        known = cls._values.get(constant)
+        if known is None or known[0] < digits:
+            tier = cls.tier(digits)
+            known = cls.__load(constant, tier)
+            if known is None:
+                with mp.workdps(tier):
+                    known = (tier, System.get_const_as_mpf(constant))
+                cls.__store(constant, *known)
+            cls._values[constant] = known
+        return known[1]
+
+    @classmethod
+    def share(cls, constants: List[str], digits: Optional[int] = None) -> None:
+        """
+        Make sure the constants are known to the required precision and install them in the pool's workers. \n
+        The pool is replaced only when the values shared change.
+        :param constants: Constant names as strings
+        :param digits: The number of digits required, defaults to sys_config.CONSTANTS_SHARED_DIGITS
+        """
+        digits = sys_config.CONSTANTS_SHARED_DIGITS if digits is None else digits
+        for constant in constants:
+            cls.get(constant, digits)
+        shared = {constant: tier for constant, (tier, _) in cls._values.items()}
+        if shared != cls._shared:
+            cls._shared = shared
+            PoolManager.set_initializer('constants', cls.install, dict(cls._values))
+
+    @classmethod
+    def install(cls, values: Dict[str, Tuple[int, mp.mpf]]) -> None:
+        """
+        Install known values (e.g. in a pool worker)
+        :param values: Mapping from constant name to its precision and value
+        """
+        for constant, (tier, value) in values.items():
+            if constant not in cls._values or cls._values[constant][0] < tier:
+                cls._values[constant] = (tier, value)
+
+    @staticmethod
+    def __connect() -> Optional[sqlite3.Connection]:
+        """
+        :return: A connection to the persistent store (creating it if needed), None if it is disabled
+        """
+        if not sys_config.USE_CONSTANTS_CACHE:
+            return None
+        conn = sqlite3.connect(sys_config.CONSTANTS_CACHE_PATH)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS constants (
+                name TEXT,
+                digits INTEGER,
+                value TEXT,
+                PRIMARY KEY (name, digits)
+            )
+        """)
+        return conn
+
+    @classmethod
+    def __load(cls, constant: str, digits: int) -> Optional[Tuple[int, mp.mpf]]:
+        """
+        Load the least precise stored value of a constant which has at least the given digits
+        :param constant: Constant name as string
+        :param digits: The number of digits required
+        :return: The precision and the stored value if exists, else None
+        """
+        try:
+            if (conn := cls.__connect()) is None:
+                return None
+            with conn:
+                row = conn.execute(
+                    "SELECT digits, value FROM constants WHERE name = ? AND digits >= ? ORDER BY digits LIMIT 1",
+                    (constant, digits)
+                ).fetchone()
+            conn.close()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        with mp.workdps(row[0]):
+            return row[0], mp.mpf(row[1])
+
+    @classmethod
+    def __store(cls, constant: str, digits: int, value: mp.mpf) -> None:
+        """
+        Persist the value of a constant at a precision tier (pool workers keep it in memory only)
+        :param constant: Constant name as string
+        :param digits: The precision of the value
+        :param value: The value
+        """
+        if multiprocessing.parent_process() is not None:
+            return
+        try:
+            if (conn := cls.__connect()) is None:
+                return
+            # the extra digits make the text round trip to the same binary value
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO constants (name, digits, value) VALUES (?, ?, ?)",
+                    (constant, digits, mp.nstr(value, digits + WorkingPrecision.GUARD_DIGITS, strip_zeros=False))
+                )
+            conn.close()
+        except sqlite3.Error:
+            pass    # the value is still kept in memory
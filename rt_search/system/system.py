@@ -16,6 +16,8 @@ from ..utils.IO.exporter import Exporter
 from ..utils.types import *
 from ..utils.logger import Logger
 from ..utils.IO.importer import Importer
+from ..utils.pool import PoolManager
+from ..utils.precision import WorkingPrecision
 from ..configs import (
     sys_config
 )
@@ -104,6 +106,7 @@ class System:
                 f'Best delta for "{const}": {best_delta} in trajectory: {best_sv} in searchable: {best_space}',
                 Logger.Levels.info
             ).log()
+        PoolManager.shutdown()
 
     def __db_stage(self, constants: Dict[str, Any]) -> Dict[str, List[ShiftCMF]]:
         modules = []
@@ -164,28 +167,25 @@ class System:
             return False
 
     @staticmethod
-    def get_const_as_mpf(constant: str) -> mp.mpf:
+    def get_const_as_mpf(constant: str, digits: Optional[int] = None) -> mp.mpf:
         """
         Convert string to a mpmath.mpf value
         :param constant: Constant name as string
+        :param digits: The number of digits required (see WorkingPrecision), defaults to the current mpmath precision
         :raise UnknownConstant if constant is unknown
         :return: the mp.mpf value
         """
-        try:
-            constant = sys_config.SYMPY_TO_MPMATH[constant]
-        except Exception:
-            raise UnknownConstant(constant + UnknownConstant.default_msg)
+        if digits is not None:
+            with WorkingPrecision(digits):
+                return System.get_const_as_mpf(constant)
 
         pieces = constant.split("-")
-        if len(pieces) == 1:
-            try:
-                return getattr(sp, constant)
-            except Exception:
-                raise UnknownConstant(constant + UnknownConstant.default_msg)
-
-        n = int(pieces[1])
+        value = sys_config.SYMPY_TO_MPMATH.get(pieces[0])
+        if value is None:
+            # not mapped to mpmath - evaluate the sympy constant instead
+            return mp.mpf(sp.N(System.get_const_as_sp(constant), mp.mp.dps)._mpf_)
         try:
-            return getattr(sp, pieces[0])(n)
+            return mp.mpf(value(int(pieces[1])) if len(pieces) > 1 else value)
         except Exception:
             raise UnknownConstant(constant + UnknownConstant.default_msg)
 
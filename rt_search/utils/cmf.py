@@ -3,7 +3,7 @@ from .IO import (
     exports as exp
 )
 
-from typing import Dict, Union
+from typing import Dict, Union, Optional, Set, Tuple, List
 
 from ramanujantools.cmf.cmf import CMF as RT_CMF
 from ramanujantools.cmf.pfq import pFq as RT_pFq
@@ -11,6 +11,7 @@ from ramanujantools import Matrix
 from sympy import srepr, sympify
 import sympy as sp
 from dataclasses import dataclass
+from itertools import combinations
 import json
 
 from .geometry.position import Position
@@ -27,6 +28,59 @@ class CMF(RT_CMF, exp.JSONExportable, imp.JSONImportable):
     def from_json_obj(cls, src: Dict[str, str]) -> "CMF":
         return cls({sympify(sym): sympify(mat) for sym, mat in src.items()})
 
+    def known_singular_hyperplanes(self) -> Optional[Set[Tuple[sp.Expr, sp.Expr]]]:
+        """
+        Hook for CMF families whose singular hyperplanes (undefined matrices or zero determinant) are known in advance.
+        :return: The hyperplanes as (lhs, rhs) equations, or None if they should be extracted from the matrices.
+        """
+        return None
+
+    def symmetries(self) -> List[Tuple[sp.Symbol, ...]]:
+        """
+        Find the blocks of symbols that can be permuted freely - swapping a and b maps M_a to M_b (and vice versa) after
+        swapping a and b in the matrices. Walking a trajectory from a start point is then equivalent (the same matrices
+        up to relabeling) to walking the permuted trajectory from the permuted start point. \n
+        The candidate transpositions are validated against the matrices, and the blocks are the connected components of
+        the valid ones (computed once per CMF).
+        :return: A list of blocks (tuples of at least 2 interchangeable symbols)
+        """
+        if getattr(self, '_symmetry_blocks', None) is None:
+            parent = {sym: sym for sym in self.matrices.keys()}
+
+            def find(sym):
+                while parent[sym] != sym:
+                    sym = parent[sym]
+                return sym
+
+            for a, b in self._candidate_transpositions():
+                if find(a) != find(b) and self.__is_symmetric(a, b):
+                    parent[find(a)] = find(b)
+            blocks = {}
+            for sym in self.matrices.keys():
+                blocks.setdefault(find(sym), []).append(sym)
+            self._symmetry_blocks = [tuple(block) for block in blocks.values() if len(block) > 1]
+        return self._symmetry_blocks
+
+    def _candidate_transpositions(self) -> List[Tuple[sp.Symbol, sp.Symbol]]:
+        """
+        :return: The pairs of symbols which might be interchangeable (all the pairs unless the CMF family is known)
+        """
+        return list(combinations(self.matrices.keys(), 2))
+
+    def __is_symmetric(self, a: sp.Symbol, b: sp.Symbol) -> bool:
+        """
+        Check if swapping two symbols maps the CMF to itself
+        :param a: The first symbol
+        :param b: The second symbol
+        :return: True if M_{swap(s)} = swap(M_s) for every symbol s, else False
+        """
+        swap = {a: b, b: a}
+        for sym, mat in self.matrices.items():
+            diff = self.matrices[swap.get(sym, sym)] - mat.xreplace(swap)
+            if any(sp.cancel(entry) != 0 for entry in diff):
+                return False
+        return True
+
 
 class pFq(CMF, RT_pFq, exp.JSONExportable):
     def __init__(self, p, q, z_eval, theta_derivative=True, negate_denominator_params=True):
@@ -35,6 +89,35 @@ class pFq(CMF, RT_pFq, exp.JSONExportable):
     def to_json_obj(self) -> Dict[str, ...]:
         return {srepr(sym): srepr(mat) for sym, mat in self.matrices.items()}
 
+    def known_singular_hyperplanes(self) -> Optional[Set[Tuple[sp.Expr, sp.Expr]]]:
+        """
+        The pFq matrices are singular exactly where a parameter is 0 or a numerator parameter and a denominator
+        parameter differ by 0 or 1: x_i = 0, y_j = 0, x_i = y_j, x_i = y_j - 1. \n
+        Other constructions (y's substituted instead of inverting the y matrices, symbolic z, or z = 1 with p = q + 1
+        which adds a balance hyperplane) are left to the generic extraction.
+        :return: The hyperplanes as (lhs, rhs) equations, or None if unknown.
+        """
+        if (not self.negate_denominator_params or not self.z.is_number or self.z == 0 or self.p + self.q < 2
+                or (self.p == self.q + 1 and self.z == 1)):
+            return None
+
+        x = sp.symbols(f'x:{self.p}')
+        y = sp.symbols(f'y:{self.q}')
+        hps = {(param, sp.Integer(0)) for param in x + y}
+        hps |= {(xi - yj, sp.Integer(0)) for xi in x for yj in y}
+        hps |= {(xi - yj + 1, sp.Integer(0)) for xi in x for yj in y}
+        return hps
+
+    def _candidate_transpositions(self) -> List[Tuple[sp.Symbol, sp.Symbol]]:
+        """
+        The pFq function is symmetric under permuting the numerator parameters and the denominator parameters, so only
+        adjacent transpositions of x's and of y's are candidates (they generate all of these permutations).
+        :return: The candidate pairs
+        """
+        x = sp.symbols(f'x:{self.p}')
+        y = sp.symbols(f'y:{self.q}')
+        return [(params[i], params[i + 1]) for params in (x, y) for i in range(len(params) - 1)]
+
 
 @dataclass
 class ShiftCMF(exp.JSONExportable, imp.JSONImportable):
@@ -0,0 +1,76 @@
+from rt_search.utils.types import *
+
+import mpmath as mp
+import numpy as np
+
+
+def convergent_errors(convergents: Dict[int, sp.Rational],
+                      constant: sp.Expr | mp.mpf,
+                      digits: Optional[int] = None) -> Tuple[List[int], List[float], List[float]]:
+    """
+    Measure how well the convergents of a walk approximate a constant.
+    A sympy constant is evaluated once, errors below 10^-digits are not resolved (see WorkingPrecision).
+    :param convergents: The rational approximation p/q found at each depth of the walk
+    :param constant: The constant approximated (sympy, or a precomputed mpmath value - see ConstantRegistry)
+    :param digits: The working precision, defaults to the current mpmath precision
+    :return: The depths (sorted), log|p/q - L| and log(q) at each depth.
+        Convergents equal to the constant have an error of -inf.
+    """
+    depths = sorted(convergents)
+    if not depths:
+        return [], [], []
+    fractions = [sp.fraction(sp.Rational(convergents[depth])) for depth in depths]
+    digits = mp.mp.dps if digits is None else digits
+    with mp.workdps(digits):
+        value = +constant if isinstance(constant, mp.mpf) else mp.mpf(sp.N(constant, digits)._mpf_)
+        log_errors, log_denoms = [], []
+        for p, q in fractions:
+            error = mp.fabs(mp.mpf(int(p)) / mp.mpf(int(q)) - value)
+            log_errors.append(float(mp.log(error)) if error else float('-inf'))
+            log_denoms.append(float(mp.log(abs(int(q)))))
+    return depths, log_errors, log_denoms
+
+
+def _slope_delta(depths: np.ndarray, log_errors: np.ndarray, log_denoms: np.ndarray) -> Optional[float]:
+    """
+    :return: The delta of the linear growth rates -1 - d(log|p/q - L|) / d(log q), None if q does not grow
+    """
+    error_rate = np.polyfit(depths, log_errors, 1)[0]
+    denom_rate = np.polyfit(depths, log_denoms, 1)[0]
+    return float(-1 - error_rate / denom_rate) if denom_rate > 0 else None
+
+
+def extrapolate_delta(depths: List[int],
+                      log_errors: List[float],
+                      log_denoms: List[float],
+                      scale: float = 0.05) -> Tuple[Optional[float], float]:
+    """
+    Estimate the asymptotic delta of a walk from its convergents at several depths. \n
+    The delta at a single depth, -1 - log|p/q - L| / log(q), is biased by the constant terms of log|p/q - L| and
+    log(q), which decay only as 1/depth. Instead, both logs are fitted as linear in the depth (least squares) and the
+    delta is taken from the ratio of the slopes, which the constant terms do not affect and which averages out the
+    jitter that gcd reductions cause in q. \n
+    The confidence measures the stability of the fit: with s the largest change of the estimate when leaving a single
+    depth out (or its distance from the delta of the deepest convergent if there are only two depths), it is
+    1 / (1 + s / scale).
+    :param depths: The sorted depths of the convergents
+    :param log_errors: log|p/q - L| at each depth
+    :param log_denoms: log(q) at each depth
+    :param scale: The deviation (in delta) at which the confidence drops to 1/2
+    :return: The extrapolated delta (None if no depth is usable) and its confidence in [0, 1]
+    """
+    points = np.array([
+        (d, e, q) for d, e, q in zip(depths, log_errors, log_denoms) if np.isfinite(e) and np.isfinite(q) and q > 0
+    ]).reshape(-1, 3)
+    if len(points) == 0:
+        return None, 0.0
+    pointwise = float(-1 - points[-1, 1] / points[-1, 2])
+    if len(points) == 1 or (delta := _slope_delta(*points.T)) is None:
+        return pointwise, 0.0
+
+    if len(points) == 2:
+        spread = abs(delta - pointwise)
+    else:
+        estimates = [_slope_delta(*np.delete(points, i, axis=0).T) for i in range(len(points))]
+        spread = max(abs(est - delta) if est is not None else np.inf for est in estimates)
+    return delta, float(1 / (1 + spread / scale))
@@ -1,6 +1,7 @@
 from ..types import *
 from dataclasses import dataclass
 import numpy as np
+import math
 
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
@@ -18,6 +19,37 @@ class Plane:
     def __post_init__(self):
         self.normal, self.point = self.__calc_normal(self.expression, self.symbols)
 
+    @property
+    def canonical_key(self) -> Tuple[int, ...]:
+        """
+        The canonical representation of the plane - its primitive integer coefficients vector.
+        The coefficients of the symbols followed by the constant are scaled by the LCM of their denominators,
+        divided by their GCD and the sign is fixed such that the first non-zero coefficient is positive.
+        Two planes are the same iff their canonical keys are equal.
+        :raise ValueError if a coefficient is not rational
+        :return: The canonical coefficients vector
+        """
+        coeffs = [self.expression.coeff(v) for v in self.symbols]
+        coeffs.append(self.expression.as_independent(*self.symbols, as_Add=True)[0])
+        if not all(sp.sympify(c).is_rational for c in coeffs):
+            raise ValueError(f'Plane {self.expression} does not have rational coefficients')
+
+        coeffs = [sp.Rational(c) for c in coeffs]
+        lcm = math.lcm(*(int(c.q) for c in coeffs))
+        ints = [int(c * lcm) for c in coeffs]
+        gcd = math.gcd(*ints)
+        if gcd == 0:
+            return tuple(ints)
+        sign = 1 if next(c for c in ints if c != 0) > 0 else -1
+        return tuple(sign * c // gcd for c in ints)
+
+    def canonical(self) -> "Plane":
+        """
+        :return: The same plane with its expression given using its canonical coefficients (see canonical_key)
+        """
+        *coeffs, const = self.canonical_key
+        return Plane(sum(c * v for c, v in zip(coeffs, self.symbols)) + const, self.symbols)
+
     def intersection_with_line_coeff(self, start: "Position", direction: "Position"):
         """
         Calculate the intersection coefficient between a plane and a line defined by start and direction.
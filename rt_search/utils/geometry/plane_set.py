@@ -0,0 +1,89 @@
+from ..types import *
+from .plane import Plane
+import numpy as np
+import copy
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from .position import Position
+
+
+class PlaneSet:
+    """
+    A compiled set of hyperplanes used to classify many points at once. \n
+    The hyperplanes are stored as a normal matrix N (k x d) and an offsets vector c such that the i-th hyperplane is
+    N_i·x + c_i = 0. If all the coefficients are integers the matrix is kept as an integer matrix.
+    """
+    ON_PLANE_TOL = 1e-4     # points closer (in value) than this to a hyperplane are considered on it
+
+    def __init__(self, hps: List[Plane], symbols: Optional[List[sp.Symbol]] = None):
+        """
+        :param hps: The hyperplanes to compile
+        :param symbols: The symbols defining the coordinates order, defaults to the symbols of the hyperplanes
+        """
+        if symbols is None:
+            symbols = hps[0].symbols if hps else []
+        self.symbols = list(symbols)
+        self.dim = len(self.symbols)
+
+        coeffs = [
+            [plane.expression.coeff(v) for v in self.symbols]
+            + [plane.expression.as_independent(*self.symbols, as_Add=True)[0]]
+            for plane in hps
+        ]
+        self.integral = all(sp.sympify(c).is_integer for row in coeffs for c in row)
+        table = np.array(
+            [[int(c) if self.integral else float(c) for c in row] for row in coeffs],
+            dtype=np.int64 if self.integral else float
+        ).reshape(len(hps), self.dim + 1)
+        self.normals = table[:, :-1]
+        self.offsets = table[:, -1]
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def subset(self, indices: List[int]) -> "PlaneSet":
+        """
+        :param indices: The indices of the hyperplanes to keep
+        :return: A plane set of only the hyperplanes in the given indices (in the same order)
+        """
+        planes = copy.copy(self)
+        planes.normals = self.normals[list(indices)]
+        planes.offsets = self.offsets[list(indices)]
+        return planes
+
+    def as_array(self, point: "Position") -> np.ndarray:
+        """
+        Convert a position to an array of coordinates matching the order of the symbols
+        :param point: The position to convert
+        :return: The coordinates as a float array
+        """
+        return np.array([float(c) for c in point.values()], dtype=float)
+
+    def values(self, points: np.ndarray) -> np.ndarray:
+        """
+        Evaluate all the hyperplanes' expressions at once
+        :param points: An (N, d) array of points (or a single point of shape (d,))
+        :return: An (N, k) array (or (k,) for a single point) of the values N_i·x + c_i
+        """
+        return np.asarray(points) @ self.normals.T + self.offsets
+
+    def classify(self, points: np.ndarray) -> np.ndarray:
+        """
+        Classify points into sign vectors with respect to the hyperplanes.
+        :param points: An (N, d) array of points (or a single point of shape (d,))
+        :return: An (N, k) array (or (k,) for a single point) of +-1's, 0 where a point is on a hyperplane.
+        """
+        values = self.values(points)
+        signs = np.sign(values).astype(np.int8)
+        signs[np.abs(values) <= self.ON_PLANE_TOL] = 0
+        return signs
+
+    def encode(self, point: "Position") -> Tuple[ShardVec, bool]:
+        """
+        Encodes the shard that the point is within its borders.
+        :param point: The point to encode
+        :return: The Shard encoding +-1's vector, True if the point is not on a hyperplane, else False.
+        """
+        encoded = tuple(int(s) for s in self.classify(self.as_array(point)))
+        return encoded, 0 not in encoded
@@ -2,19 +2,38 @@ from ..types import *
 
 import math
 import mpmath as mp
-import itertools
 import numpy as np
-from numpy import linalg
 from itertools import product
+from scipy.stats import qmc, norm as normal
 
 
 Point = Tuple[int, ...]
 
 
 class PointGenerator:
+    ENUMERATION_LIMIT = 2 ** 20     # shapes whose bounding cube holds fewer points are sampled by enumeration
+    MAX_STALE_BATCHES = 8           # stop sampling after this many batches in a row with no new points
+    SHELL_BLOCK = 2 ** 15           # number of prefixes handled at once when streaming shells
+
     @classmethod
-    def generate_random_sphere(cls, n: int, radius: int, dim: int):
-        raise NotImplementedError
+    def generate_random_sphere(cls,
+                               n: int,
+                               radius: int | sp.Rational,
+                               dim: int,
+                               as_primitive=False,
+                               seed: Optional[int] = None,
+                               low_discrepancy=False) -> np.ndarray:
+        """
+        Sample distinct integer points inside and on a sphere of a certain radius which is centered around the origin
+        :param n: The number of points to sample
+        :param radius: The radius of the sphere
+        :param dim: the dimensions in which the sphere/hypersphere lives
+        :param as_primitive: Sample only points whose coordinates have gcd 1
+        :param seed: Seed of the random generator (None for a random seed)
+        :param low_discrepancy: Use a scrambled Sobol sequence instead of pseudo-random numbers
+        :return: An (N, dim) integer array of the sampled points (N < n only if the sphere has fewer such points)
+        """
+        return cls.__sample_lattice(n, radius, dim, 'sphere', as_primitive, seed, low_discrepancy)
 
     @classmethod
     def generate_cube(cls, edge_len: int, dim: int, as_primitive=False) -> Set[Point]:
@@ -25,10 +44,83 @@ class PointGenerator:
         :param as_primitive: Enforce gcd of coordinates to be 1
         :return: A set of points inside and on a cube
         """
-        points = list(itertools.product(range(-edge_len, edge_len + 1), repeat=dim))
-        if as_primitive:
-            return {cls.__to_primitive_vec(p) for p in points}
-        return set(points)
+        return cls.as_point_set(cls.generate_cube_array(edge_len, dim, as_primitive))
+
+    @classmethod
+    def generate_cube_array(cls, edge_len: int, dim: int, as_primitive=False) -> np.ndarray:
+        """
+        Generate the integer points inside and on a cube of a certain edge length which is centered around the origin
+        :param edge_len: the edge length of the cube
+        :param dim: the dimensions in which the cube/hypercube lives
+        :param as_primitive: Keep only points whose coordinates have gcd 1
+        :return: An (N, dim) integer array of the points (ordered as in itertools.product)
+        """
+        return cls.__lattice_array(int(edge_len), dim, as_primitive)
+
+    @classmethod
+    def generate_sphere_array(cls, radius: int | sp.Rational, dim: int, as_primitive=False) -> np.ndarray:
+        """
+        Generate the integer points inside and on a sphere of a certain radius which is centered around the origin
+        :param radius: The radius of the sphere
+        :param dim: the dimensions in which the sphere/hypersphere lives
+        :param as_primitive: Keep only points whose coordinates have gcd 1
+        :return: An (N, dim) integer array of the points (ordered as in itertools.product)
+        """
+        return cls.__lattice_array(math.floor(radius), dim, as_primitive, radius)
+
+    @classmethod
+    def __lattice_array(cls,
+                        edge_len: int,
+                        dim: int,
+                        as_primitive: bool,
+                        radius: Optional[int | sp.Rational] = None) -> np.ndarray:
+        """
+        Build the integer grid [-edge_len, edge_len]^dim filtered by norm and primitivity. \n
+        The grid is built one value of the first coordinate at a time, so the norms and gcds of the remaining
+        coordinates are computed once and the full (unfiltered) grid is never materialized.
+        :param edge_len: The maximal absolute value of a coordinate
+        :param dim: The dimension of the points
+        :param as_primitive: Keep only points whose coordinates have gcd 1
+        :param radius: If given, keep only points of L_2 norm at most radius
+        :return: An (N, dim) integer array of the points
+        """
+        if dim == 0:
+            return np.zeros((0 if as_primitive else 1, 0), dtype=np.int64)
+
+        rest = cls.__grid(edge_len, dim - 1)
+        rest_sq = np.sum(rest * rest, axis=1)
+        rest_gcd = np.gcd.reduce(rest, axis=1)
+        blocks = []
+        for first in range(-edge_len, edge_len + 1):
+            mask = np.ones(len(rest), dtype=bool)
+            if radius is not None:
+                mask &= first * first + rest_sq <= float(radius ** 2)
+            if as_primitive:
+                mask &= np.gcd(rest_gcd, first) == 1
+            block = rest[mask]
+            blocks.append(np.hstack([np.full((len(block), 1), first, dtype=np.int64), block]))
+        return np.vstack(blocks)
+
+    @staticmethod
+    def __grid(edge_len: int, dim: int) -> np.ndarray:
+        """
+        :param edge_len: The maximal absolute value of a coordinate
+        :param dim: The dimension of the points
+        :return: All the integer points in [-edge_len, edge_len]^dim as an array (ordered as in itertools.product)
+        """
+        if dim == 0:
+            return np.zeros((1, 0), dtype=np.int64)
+        axis = np.arange(-edge_len, edge_len + 1, dtype=np.int64)
+        return np.stack(np.meshgrid(*[axis] * dim, indexing='ij'), axis=-1).reshape(-1, dim)
+
+    @staticmethod
+    def as_point_set(points: np.ndarray) -> Set[Point]:
+        """
+        Convert an array of points to a set of tuples
+        :param points: An (N, d) integer array of points
+        :return: The set of points
+        """
+        return set(map(tuple, np.asarray(points, dtype=np.int64).tolist()))
 
     @classmethod
     def generate_via_shape(cls,
@@ -37,7 +129,9 @@ class PointGenerator:
                            shape: str,
                            as_primitive=False,
                            random=False,
-                           n: Optional[int] = None) -> Set[Point]:
+                           n: Optional[int] = None,
+                           seed: Optional[int] = None,
+                           low_discrepancy=False) -> Set[Point]:
         """
         Generate a set of points matching some hyper-shapes. This could be done randomly by giving a number
          of required points.
@@ -47,29 +141,145 @@ class PointGenerator:
         :param as_primitive: All points will have coordinates with gcd 1
         :param random: Points will be sampled randomly
         :param n: Amount of points to sample randomly
+        :param seed: Seed of the random sampling
+        :param low_discrepancy: Sample randomly using a low-discrepancy (Sobol) sequence
         :return: The generated set of points
         """
+        return cls.as_point_set(
+            cls.generate_via_shape_array(length, dim, shape, as_primitive, random, n, seed, low_discrepancy)
+        )
+
+    @classmethod
+    def generate_via_shape_array(cls,
+                                 length: int,
+                                 dim: int,
+                                 shape: str,
+                                 as_primitive=False,
+                                 random=False,
+                                 n: Optional[int] = None,
+                                 seed: Optional[int] = None,
+                                 low_discrepancy=False) -> np.ndarray:
+        """
+        Generate the points matching some hyper-shapes as an array. This could be done randomly by giving a number
+         of required points.
+        :param length: The side length or radius length of the respective shape specified
+        :param dim: The dimensions of the specified shape
+        :param shape: The shape to create (cube / sphere / etc.)
+        :param as_primitive: All points will have coordinates with gcd 1
+        :param random: Points will be sampled randomly
+        :param n: Amount of points to sample randomly
+        :param seed: Seed of the random sampling
+        :param low_discrepancy: Sample randomly using a low-discrepancy (Sobol) sequence
+        :return: An (N, dim) integer array of the generated points
+        """
         if random and n is None:
             raise ValueError('Option chosen is random but number of points unspecified')
         match shape:
             case 'cube':
                 if random:
-                    return cls.generate_random_cube(n, length, dim)
-                return cls.generate_cube(length, dim, as_primitive)
+                    return cls.generate_random_cube(n, length, dim, as_primitive, seed, low_discrepancy)
+                return cls.generate_cube_array(length, dim, as_primitive)
             case 'sphere':
                 if random:
-                    return cls.generate_random_sphere(n, length, dim)
-                return cls.generate_sphere(length, dim, as_primitive)
+                    return cls.generate_random_sphere(n, length, dim, as_primitive, seed, low_discrepancy)
+                return cls.generate_sphere_array(length, dim, as_primitive)
             case _:
                 raise ValueError(f"Invalid shape: {shape}, shape must be 'cube' / 'sphere'")
 
     @classmethod
-    def generate_random_cube(cls, n: int, edge_len: int, dim: int):
-        raise NotImplementedError
+    def generate_random_cube(cls,
+                             n: int,
+                             edge_len: int,
+                             dim: int,
+                             as_primitive=False,
+                             seed: Optional[int] = None,
+                             low_discrepancy=False) -> np.ndarray:
+        """
+        Sample distinct integer points inside and on a cube of a certain edge length which is centered around the origin
+        :param n: The number of points to sample
+        :param edge_len: the edge length of the cube
+        :param dim: the dimensions in which the cube/hypercube lives
+        :param as_primitive: Sample only points whose coordinates have gcd 1
+        :param seed: Seed of the random generator (None for a random seed)
+        :param low_discrepancy: Use a scrambled Sobol sequence instead of pseudo-random numbers
+        :return: An (N, dim) integer array of the sampled points (N < n only if the cube has fewer such points)
+        """
+        return cls.__sample_lattice(n, edge_len, dim, 'cube', as_primitive, seed, low_discrepancy)
 
     @classmethod
-    def generate_sphere(cls, radius: int, dim: int, as_primitive=False):
-        return cls.limit_by_norm(cls.generate_cube(radius, dim, as_primitive), radius)
+    def __sample_lattice(cls,
+                         n: int,
+                         length: int | sp.Rational,
+                         dim: int,
+                         shape: str,
+                         as_primitive: bool,
+                         seed: Optional[int],
+                         low_discrepancy: bool) -> np.ndarray:
+        """
+        Sample distinct lattice points of a shape. \n
+        Small shapes are enumerated and a uniform subset is chosen (unless a low-discrepancy sample is requested).
+        Otherwise, points are drawn uniformly from the
+        continuous shape (for a sphere - a normal direction scaled by radius * u^(1/dim)) and rounded to the lattice in
+        batches, rejecting points outside the shape, non-primitive points and repetitions until n points are found.
+        :param n: The number of points to sample
+        :param length: The side length or radius length of the shape
+        :param dim: The dimension of the points
+        :param shape: 'cube' / 'sphere'
+        :param as_primitive: Sample only points whose coordinates have gcd 1
+        :param seed: Seed of the random generator
+        :param low_discrepancy: Use a scrambled Sobol sequence instead of pseudo-random numbers
+        :return: An (N, dim) integer array of the sampled points
+        """
+        rng = np.random.default_rng(seed)
+        edge_len = math.floor(length)
+        if (2 * edge_len + 1) ** dim <= cls.ENUMERATION_LIMIT:
+            points = cls.__lattice_array(edge_len, dim, as_primitive, length if shape == 'sphere' else None)
+            if not low_discrepancy or n >= len(points):
+                return points[np.sort(rng.permutation(len(points))[:n])]
+
+        sampler = qmc.Sobol(dim + 1, scramble=True, seed=rng) if low_discrepancy else None
+        found = np.zeros((0, dim), dtype=np.int64)
+        stale = 0
+        while len(found) < n and stale < cls.MAX_STALE_BATCHES:
+            batch = 2 * (n - len(found))
+            if sampler is None:
+                u = rng.random((batch, dim + 1))
+            elif sampler.num_generated == 0:
+                u = sampler.random_base2(math.ceil(math.log2(batch)))
+            else:
+                # keep the total number of Sobol points a power of 2 (balance properties)
+                u = sampler.random(sampler.num_generated)
+
+            if shape == 'cube':
+                points = np.minimum(np.floor(u[:, :dim] * (2 * edge_len + 1)), 2 * edge_len) - edge_len
+            else:
+                directions = normal.ppf(np.clip(u[:, :dim], 1e-12, 1 - 1e-12))
+                directions /= np.linalg.norm(directions, axis=1)[:, None]
+                points = np.rint(directions * float(length) * u[:, dim:] ** (1 / dim))
+            points = points.astype(np.int64)
+
+            mask = np.ones(len(points), dtype=bool)
+            if shape == 'sphere':
+                mask &= np.sum(points * points, axis=1) <= float(length) ** 2
+            if as_primitive:
+                mask &= np.gcd.reduce(points, axis=1) == 1
+            merged = np.vstack([found, points[mask]])
+            _, first = np.unique(merged, axis=0, return_index=True)
+            merged = merged[np.sort(first)]
+            stale = stale + 1 if len(merged) == len(found) else 0
+            found = merged
+        return found[:n]
+
+    @classmethod
+    def generate_sphere(cls, radius: int, dim: int, as_primitive=False) -> Set[Point]:
+        """
+        Generate a set of points inside and on a sphere of a certain radius which is centered around the origin
+        :param radius: The radius of the sphere
+        :param dim: the dimensions in which the sphere/hypersphere lives
+        :param as_primitive: Enforce gcd of coordinates to be 1
+        :return: A set of points inside and on a sphere
+        """
+        return cls.as_point_set(cls.generate_sphere_array(radius, dim, as_primitive))
 
     @classmethod
     def expand_set(cls,
@@ -116,7 +326,12 @@ class PointGenerator:
         :param norm: The maximum L_2 norm
         :return: The filtered set
         """
-        return {p for p in points if linalg.norm(np.array(p, dtype=float)) <= norm}
+        if not points:
+            return set()
+        points = list(points)
+        arr = np.array(points, dtype=float).reshape(len(points), -1)
+        inside = np.sum(arr * arr, axis=1) <= float(norm) ** 2
+        return {p for p, keep in zip(points, inside) if keep}
 
     @classmethod
     def __to_primitive_vec(cls, v: Point) -> Point:
@@ -125,11 +340,110 @@ class PointGenerator:
         :param v: The vector to convert
         :return: The vector as primitive
         """
-        g = sp.gcd(v)
+        g = math.gcd(*v)
         if g == 0:
             return v
         return tuple(int(x // g) for x in v)
 
+    @classmethod
+    def iter_shells(cls,
+                    dim: int,
+                    as_primitive=True,
+                    chunk_size: int = 1024,
+                    max_radius: Optional[int | sp.Rational] = None) -> Iterator[np.ndarray]:
+        """
+        Lazily generate the integer points (except the origin) in increasing L_2 norm. \n
+        The points are generated in bands of squared norms expected to hold about chunk_size points each (at least one
+        squared norm per band). A band of several squared norms is sorted as a whole, while the points of a single
+        squared norm (which grow in number with the radius) are streamed in blocks since their order is arbitrary.
+        The bands are built from blocks of at most SHELL_BLOCK prefixes (see __shell_blocks), so the memory used is
+        bounded by the chunk and block sizes regardless of the radius reached.
+        :param dim: The dimension of the points
+        :param as_primitive: Generate only points whose coordinates have gcd 1
+        :param chunk_size: The number of points in each chunk yielded (the last chunk may be smaller)
+        :param max_radius: Stop after the points of this norm (None for an endless stream)
+        :return: An iterator of (N, dim) integer arrays of the points ordered by their norm
+        """
+        if dim == 0:
+            return
+        volume = math.pi ** (dim / 2) / math.gamma(dim / 2 + 1)     # of the unit ball
+        max_sq = None if max_radius is None else math.floor(float(max_radius) ** 2)
+        pending = np.zeros((0, dim), dtype=np.int64)
+        lo = 0
+        while max_sq is None or lo < max_sq:
+            # the band lo < |p|^2 <= hi is expected to hold about chunk_size points
+            hi = max(lo + 1, math.floor((lo ** (dim / 2) + chunk_size / volume) ** (2 / dim)))
+            hi = hi if max_sq is None else min(hi, max_sq)
+            blocks = cls.__shell_blocks(dim, lo, hi, max(chunk_size, cls.SHELL_BLOCK))
+            if hi - lo > 1:
+                band = np.vstack(list(blocks))
+                blocks = [band[np.argsort(np.sum(band * band, axis=1), kind='stable')]]
+            for points in blocks:
+                if as_primitive:
+                    points = points[np.gcd.reduce(points, axis=1) == 1]
+                pending = np.vstack([pending, points])
+                while len(pending) >= chunk_size:
+                    yield pending[:chunk_size]
+                    pending = pending[chunk_size:]
+            lo = hi
+        if len(pending) > 0:
+            yield pending
+
+    @classmethod
+    def __shell_blocks(cls, dim: int, lo: int, hi: int, block_size: int) -> Iterator[np.ndarray]:
+        """
+        Lazily build the integer points p such that lo < |p|^2 <= hi. \n
+        The prefixes of the first dim - 1 coordinates are enumerated in blocks (see __ball_blocks), and the values of
+        the last coordinate matching each prefix are found with an integer square root.
+        :param dim: The dimension of the points
+        :param lo: The (exclusive) lower bound on the squared norm
+        :param hi: The (inclusive) upper bound on the squared norm
+        :param block_size: The approximate number of prefixes handled at once
+        :return: An iterator of (N, dim) integer arrays of the points
+        """
+        for prefixes in cls.__ball_blocks(dim - 1, hi, block_size):
+            prefixes_sq = np.sum(prefixes * prefixes, axis=1)
+            # the last coordinate y matches a prefix iff lower <= |y| <= upper
+            upper = cls.__isqrt(hi - prefixes_sq)
+            lower = np.where(prefixes_sq <= lo, cls.__isqrt(np.maximum(lo - prefixes_sq, 0)) + 1, 0)
+            counts = np.maximum(upper - lower + 1, 0)
+            rows = np.repeat(np.arange(len(prefixes)), counts)
+            values = lower[rows] + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            rows = np.concatenate([rows, rows[values > 0]])
+            values = np.concatenate([values, -values[values > 0]])
+            yield np.hstack([prefixes[rows], values[:, None]])
+
+    @classmethod
+    def __ball_blocks(cls, dim: int, bound_sq: int, block_size: int) -> Iterator[np.ndarray]:
+        """
+        Lazily build the integer points p such that |p|^2 <= bound_sq. \n
+        The leading coordinates are fixed one at a time until the grid of the remaining ones holds at most block_size
+        points, so only a single block is built at a time.
+        :param dim: The dimension of the points
+        :param bound_sq: The (inclusive) upper bound on the squared norm
+        :param block_size: The maximal number of points in a block
+        :return: An iterator of (N, dim) integer arrays of the points
+        """
+        edge_len = math.isqrt(bound_sq)
+        if (2 * edge_len + 1) ** dim <= block_size:
+            grid = cls.__grid(edge_len, dim)
+            yield grid[np.sum(grid * grid, axis=1) <= bound_sq]
+            return
+        for first in range(-edge_len, edge_len + 1):
+            for rest in cls.__ball_blocks(dim - 1, bound_sq - first * first, block_size):
+                yield np.hstack([np.full((len(rest), 1), first, dtype=np.int64), rest])
+
+    @staticmethod
+    def __isqrt(values: np.ndarray) -> np.ndarray:
+        """
+        :param values: An array of non-negative integers (below 2^52)
+        :return: The integer square root of each value
+        """
+        roots = np.floor(np.sqrt(values.astype(np.float64))).astype(np.int64)
+        roots -= roots * roots > values
+        roots += (roots + 1) * (roots + 1) <= values
+        return roots
+
     @classmethod
     def generate_hyperplane(cls, n: int, dim: int, hp: sp.Expr):
         raise NotImplementedError
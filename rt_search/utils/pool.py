@@ -0,0 +1,120 @@
+from rt_search.utils.types import *
+from rt_search.configs import sys_config, config
+
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import atexit
+import pickle
+
+
+class PoolManager:
+    """
+    A single process pool shared by the analysis and search stages. \n
+    The pool is created lazily on first use with at most sys_config.POOL_MAX_WORKERS workers and reused afterwards.
+    The workers are forked (explicitly, whatever the platform's default start method is) so they inherit the
+    configurations of the running system. Where forking is unavailable (Windows), the workers are spawned and receive
+    the (picklable) configurations through an initializer instead. Forking rules out recycling single workers
+    (max_tasks_per_child requires spawning), so the pool is replaced as a whole every sys_config.POOL_RECYCLE_TASKS
+    tasks - large maps are split into chunks of that size - releasing the memory (e.g. sympy caches) held by the workers.
+    Every worker runs the registered initializers (see set_initializer) when it starts.
+    """
+    _pool: Optional[ProcessPoolExecutor] = None
+    _tasks: int = 0
+    _initializers: Dict[str, Tuple[Callable, tuple]] = {}
+
+    @classmethod
+    def get(cls) -> ProcessPoolExecutor:
+        """
+        Retrieve the shared pool, creating (or recycling) it if needed
+        :return: The process pool
+        """
+        if cls._pool is not None and 0 < sys_config.POOL_RECYCLE_TASKS <= cls._tasks:
+            cls.shutdown()
+        if cls._pool is None:
+            initializers = list(cls._initializers.values())
+            if 'fork' in multiprocessing.get_all_start_methods():
+                context = multiprocessing.get_context('fork')
+            else:
+                context = multiprocessing.get_context()
+                initializers.insert(0, (PoolManager._install_configs, (PoolManager._config_snapshot(),)))
+            cls._pool = ProcessPoolExecutor(
+                max_workers=sys_config.POOL_MAX_WORKERS,
+                mp_context=context,
+                initializer=PoolManager._initialize,
+                initargs=(initializers,)
+            )
+            cls._tasks = 0
+        return cls._pool
+
+    @classmethod
+    def map(cls, fn: Callable, iterable: Iterable, chunksize: int = 1) -> List[Any]:
+        """
+        Apply a function on every item using the shared pool.
+        The items are mapped in parts of at most sys_config.POOL_RECYCLE_TASKS, recycling the pool between them when
+        needed. The results are collected before returning, so the pool can be safely recycled by the next call.
+        :param fn: The (picklable) function to apply
+        :param iterable: The items to apply the function on
+        :param chunksize: The number of items sent to a worker at once
+        :return: The list of results (in the order of the items)
+        """
+        items = list(iterable)
+        size = sys_config.POOL_RECYCLE_TASKS if sys_config.POOL_RECYCLE_TASKS > 0 else max(len(items), 1)
+        results = []
+        for i in range(0, len(items), size):
+            part = items[i:i + size]
+            pool = cls.get()
+            cls._tasks += len(part)
+            results += pool.map(fn, part, chunksize=chunksize)
+        return results
+
+    @classmethod
+    def set_initializer(cls, key: str, fn: Callable, *args) -> None:
+        """
+        Register (or replace) a function every worker runs when it starts.
+        The running pool (if any) is shut down, so the next use creates workers which all ran it.
+        :param key: The name of the initializer
+        :param fn: The (picklable) function to run
+        :param args: The arguments to call the function with
+        """
+        cls._initializers[key] = (fn, args)
+        cls.shutdown()
+
+    @staticmethod
+    def _initialize(initializers: List[Tuple[Callable, tuple]]) -> None:
+        for fn, args in initializers:
+            fn(*args)
+
+    @staticmethod
+    def _config_snapshot() -> Dict[str, Dict[str, Any]]:
+        """
+        :return: The current value of every configuration which can be sent to a spawned worker, by section
+        """
+        snapshot = {}
+        for section, names in config.get_configurables().items():
+            snapshot[section] = {}
+            for name in names:
+                value = getattr(getattr(config, section), name)
+                try:
+                    pickle.dumps(value)
+                except Exception:
+                    continue    # e.g. lambdas - the worker keeps the default
+                snapshot[section][name] = value
+        return snapshot
+
+    @staticmethod
+    def _install_configs(snapshot: Dict[str, Dict[str, Any]]) -> None:
+        config.configure(**snapshot)
+
+    @classmethod
+    def shutdown(cls, wait: bool = True) -> None:
+        """
+        Shut down the shared pool (if exists). A new pool is created on the next use.
+        :param wait: Wait for the workers to finish their pending tasks
+        """
+        if cls._pool is not None:
+            cls._pool.shutdown(wait=wait, cancel_futures=True)
+            cls._pool = None
+            cls._tasks = 0
+
+
+atexit.register(PoolManager.shutdown)
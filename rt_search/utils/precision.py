@@ -0,0 +1,68 @@
+from rt_search.utils.types import *
+from rt_search.configs import sys_config
+
+from ramanujantools import Limit
+import mpmath as mp
+
+
+class WorkingPrecision:
+    """
+    A per-task mpmath working precision. \n
+    Entering the context sets mp.mp.dps and exiting restores the previous value, so the precision of one task never
+    leaks into the next task of the same pool worker. The precision starts from what the walk can resolve and is
+    escalated (doubled, up to sys_config.MAX_WORKING_DIGITS) only when a computation turns out to need more digits.
+    """
+    GUARD_DIGITS = 20
+
+    def __init__(self, digits: int, max_digits: Optional[int] = None):
+        """
+        :param digits: The number of digits required (guard digits are added on top)
+        :param max_digits: The maximal number of digits to escalate to, defaults to sys_config.MAX_WORKING_DIGITS
+        """
+        self.max_digits = sys_config.MAX_WORKING_DIGITS if max_digits is None else max_digits
+        self.digits = min(max(int(digits), 0) + self.GUARD_DIGITS, self.max_digits)
+        self._saved = []
+
+    @classmethod
+    def for_limit(cls, limit: Limit, max_digits: Optional[int] = None) -> "WorkingPrecision":
+        """
+        Create a working precision matching a walk - the number of digits its convergent is accurate to,
+        estimated from the agreement of its last two convergents.
+        :param limit: The limit of the walk
+        :param max_digits: The maximal number of digits to escalate to
+        :return: The working precision
+        """
+        return cls(limit.precision(), max_digits)
+
+    def __enter__(self) -> "WorkingPrecision":
+        self._saved.append(mp.mp.dps)
+        mp.mp.dps = self.digits
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        mp.mp.dps = self._saved.pop()
+
+    def escalate(self) -> bool:
+        """
+        Double the working precision (inside the context, the new precision takes effect immediately)
+        :return: True if the precision was raised, False if it is already at its maximum
+        """
+        if self.digits >= self.max_digits:
+            return False
+        self.digits = min(2 * self.digits, self.max_digits)
+        if self._saved:
+            mp.mp.dps = self.digits
+        return True
+
+    def run(self, compute: Callable[[], Any], resolved: Callable[[Any], bool]) -> Any:
+        """
+        Compute at the working precision, escalating until the result is resolved or the maximum is reached
+        :param compute: The computation (uses the current mpmath precision)
+        :param resolved: Checks whether a result was computed with enough digits
+        :return: The last result computed
+        """
+        with self:
+            result = compute()
+            while not resolved(result) and self.escalate():
+                result = compute()
+        return result
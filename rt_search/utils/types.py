@@ -1,5 +1,5 @@
 import sympy as sp
-from typing import Union, List, Tuple, Dict, Set, Any, FrozenSet, Optional, Type, TextIO, Callable
+from typing import Union, List, Tuple, Dict, Set, Any, FrozenSet, Optional, Type, TextIO, Callable, Iterable, Iterator
 
 from .cmf import CMF, ShiftCMF
 
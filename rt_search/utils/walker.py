@@ -0,0 +1,396 @@
+from rt_search.utils.types import *
+
+from ramanujantools import Matrix, Limit
+from functools import reduce
+from fractions import Fraction
+from flint import fmpz_mat, fmpz, nmod_mat
+import numpy as np
+import mpmath as mp
+
+
+class CompiledWalker:
+    """
+    A trajectory matrix M(n) compiled for walking over exact integers. \n
+    The matrix is written once as M(n) = P(n) / s(n) where the entries of P and the scalar s are integer polynomials
+    stored as coefficient lists. Each step evaluates them in Horner form over Python ints and multiplies integer
+    matrices (flint's fmpz_mat), so no sympy substitution and no rational normalization happens inside the walk.
+    The scalar denominators are multiplied separately and divided out only for the matrices returned. \n
+    With product_tree, every range of the walk is multiplied by binary splitting - the two halves of the range are
+    multiplied recursively and then together - so the big integer multiplications run on operands of similar size
+    instead of multiplying a huge accumulated product by a small step matrix each time. \n
+    The walk can also be screened modulo a few primes below 2^29 (so products of residues and their sums fit in int64)
+    to reject degenerate walks before any exact computation.
+    """
+    PRODUCT_TREE_LEAF = 16
+    SCREEN_PRIMES = (536870909, 536870879, 536870869)
+    GENERIC_POINT = 387420489
+
+    def __init__(self, matrix: Matrix, product_tree: bool = False):
+        """
+        :param matrix: A square matrix of rational functions in a single symbol (e.g. a CMF trajectory matrix)
+        :param product_tree: Multiply the walk by binary splitting instead of left to right
+        :raise ValueError: If the matrix is not square or depends on more than one symbol
+        """
+        if not matrix.is_square:
+            raise ValueError(f'Only square matrices can be walked, got a {matrix.rows}x{matrix.cols} matrix')
+        free = matrix.free_symbols
+        if len(free) > 1:
+            raise ValueError(f'Only univariate matrices can be compiled, got symbols {free}')
+        self.symbol = free.pop() if free else sp.Symbol('n')
+        self.dim = matrix.rows
+        self.product_tree = product_tree
+
+        fractions = [sp.fraction(sp.cancel(sp.together(entry))) for entry in matrix]
+        denominator = reduce(sp.lcm, [den for _, den in fractions], sp.Integer(1))
+        polys = [sp.Poly(sp.cancel(num * denominator / den), self.symbol) for num, den in fractions]
+        scalar = sp.Poly(denominator, self.symbol)
+
+        # clear the rational coefficients so all the polynomials are over the integers
+        scale = sp.ilcm(*[sp.fraction(c)[1] for poly in polys + [scalar] for c in poly.coeffs()])
+        self.entries = [[int(c * scale) for c in poly.all_coeffs()] for poly in polys]
+        self.scalar = [int(c * scale) for c in scalar.all_coeffs()]
+
+    @staticmethod
+    def _horner(coeffs: List[int], x: int) -> int:
+        """
+        :param coeffs: The polynomial's coefficients (highest degree first)
+        :param x: The point to evaluate at
+        :return: The value of the polynomial at x
+        """
+        value = 0
+        for c in coeffs:
+            value = value * x + c
+        return value
+
+    def step(self, x: int) -> Tuple[List[List[int]], int]:
+        """
+        Evaluate the compiled matrix at a point
+        :param x: The point to evaluate at
+        :return: The integer matrix P(x) (as rows) and the scalar s(x) such that M(x) = P(x) / s(x)
+        :raise ZeroDivisionError: If the matrix is undefined at x
+        """
+        scalar = self._horner(self.scalar, x)
+        if scalar == 0:
+            raise ZeroDivisionError(f'The matrix is undefined at {self.symbol} = {x}')
+        values = [self._horner(coeffs, x) for coeffs in self.entries]
+        return [values[i * self.dim:(i + 1) * self.dim] for i in range(self.dim)], scalar
+
+    def walk_integer(self,
+                     iterations: List[int],
+                     start: int = 0,
+                     trajectory: int = 1) -> List[Tuple[fmpz_mat, fmpz]]:
+        """
+        Walk over the integers - compute prod_{i=0}^{N-1} P(start + i * trajectory) and the matching product of s.
+        :param iterations: The sorted depths N to return the products at
+        :param start: The starting point of the walk
+        :param trajectory: The step size of the walk
+        :return: For each depth, the integer product matrix and the scalar product
+        """
+        results = []
+        product, scalar = self._identity()
+        done = 0
+        for depth in iterations:
+            if depth > done:
+                product, scalar = self._extend(product, scalar, done, depth, start, trajectory)
+                done = depth
+            results.append((product, scalar))
+        return results
+
+    def _extend(self,
+                product: fmpz_mat,
+                scalar: fmpz,
+                lo: int,
+                hi: int,
+                start: int,
+                trajectory: int) -> Tuple[fmpz_mat, fmpz]:
+        """
+        Continue a walk by the steps lo, ..., hi - 1
+        :param product: The integer product of the steps before lo
+        :param scalar: The scalar product of the steps before lo
+        :param lo: The first step (inclusive)
+        :param hi: The last step (exclusive)
+        :param start: The starting point of the walk
+        :param trajectory: The step size of the walk
+        :return: The integer product matrix and the scalar product of the steps before hi
+        """
+        if self.product_tree and hi > lo:
+            mat, s = self._range_product(lo, hi, start, trajectory)
+            return product * mat, scalar * s
+        for i in range(lo, hi):
+            values, s = self.step(start + i * trajectory)
+            product, scalar = product * fmpz_mat(values), scalar * s
+        return product, scalar
+
+    def _to_matrix(self, product: fmpz_mat, scalar: fmpz) -> Matrix:
+        """
+        :return: The rational walk matrix product / scalar
+        """
+        return Matrix(self.dim, self.dim, [sp.Rational(int(x), int(scalar)) for x in product.entries()])
+
+    def _identity(self) -> Tuple[fmpz_mat, fmpz]:
+        """
+        :return: The identity matrix and a unit scalar (the empty product)
+        """
+        return fmpz_mat(self.dim, self.dim, [int(i == j) for i in range(self.dim) for j in range(self.dim)]), fmpz(1)
+
+    def _range_product(self, lo: int, hi: int, start: int, trajectory: int) -> Tuple[fmpz_mat, fmpz]:
+        """
+        Multiply the steps lo, ..., hi - 1 of the walk by binary splitting
+        :param lo: The first step (inclusive)
+        :param hi: The last step (exclusive)
+        :param start: The starting point of the walk
+        :param trajectory: The step size of the walk
+        :return: The integer product matrix of the range and the scalar product
+        """
+        if hi - lo <= self.PRODUCT_TREE_LEAF:
+            product, scalar = self._identity()
+            for i in range(lo, hi):
+                values, s = self.step(start + i * trajectory)
+                product, scalar = product * fmpz_mat(values), scalar * s
+            return product, scalar
+        mid = (lo + hi) // 2
+        left, left_scalar = self._range_product(lo, mid, start, trajectory)
+        right, right_scalar = self._range_product(mid, hi, start, trajectory)
+        return left * right, left_scalar * right_scalar
+
+    def walk(self,
+             iterations: int | List[int],
+             start: int = 0,
+             trajectory: int = 1) -> Matrix | List[Matrix]:
+        """
+        Same as Matrix.walk({n: trajectory}, iterations, {n: start})
+        :param iterations: The number of matrices to multiply (or a sorted list of such numbers)
+        :param start: The starting point of the walk
+        :param trajectory: The step size of the walk
+        :return: The walk matrix (or a list of them if iterations is a list)
+        """
+        depths = [iterations] if isinstance(iterations, int) else list(iterations)
+        results = [self._to_matrix(product, scalar) for product, scalar in self.walk_integer(depths, start, trajectory)]
+        return results[0] if isinstance(iterations, int) else results
+
+    def limit(self,
+              iterations: int | List[int],
+              start: int = 0,
+              trajectory: int = 1) -> Limit | List[Limit]:
+        """
+        Same as Matrix.limit({n: trajectory}, iterations, {n: start})
+        :param iterations: The depth of the walk (or a sorted list of depths)
+        :param start: The starting point of the walk
+        :param trajectory: The step size of the walk
+        :return: The limit of the walk (or a list of them if iterations is a list)
+        """
+        depths = [iterations] if isinstance(iterations, int) else list(iterations)
+        limits = Limit.walk_to_limit(depths, lambda its: self.walk(its, start, trajectory))
+        return limits[0] if isinstance(iterations, int) else limits
+
+    def limit_adaptive(self,
+                       digits: int,
+                       max_depth: int,
+                       min_depth: int = 100,
+                       start: int = 0,
+                       trajectory: int = 1) -> Dict[int, Limit]:
+        """
+        Walk in stages of doubling depth, from min_depth up to max_depth, and stop once the convergents of two
+        successive stages agree to the required digits. The walk also stops early once the rate at which the agreement
+        grows (digits per step, over the last stages) shows the digits cannot be reached within max_depth.
+        :param digits: The number of (relative) digits the successive convergents should agree to
+        :param max_depth: The maximal depth of the walk
+        :param min_depth: The depth of the first stage
+        :param start: The starting point of the walk
+        :param trajectory: The step size of the walk
+        :return: The limits at the depths of the stages walked - the last one is the depth chosen
+        """
+        stages = {}
+        product, scalar = self._identity()
+        done, depth = 0, max(1, min(min_depth, max_depth))
+        convergent, agreements = None, []
+        while True:
+            previous, previous_scalar = self._extend(product, scalar, done, depth - 1, start, trajectory)
+            product, scalar = self._extend(previous, previous_scalar, depth - 1, depth, start, trajectory)
+            done = depth
+            stages[depth] = (product, scalar, previous, previous_scalar)
+
+            last, convergent = convergent, (int(product[0, self.dim - 1]), int(product[1, self.dim - 1]))
+            if last is not None:
+                agreements.append((depth, self._agreement(last, convergent)))
+                if agreements[-1][1] >= digits:
+                    break
+                if len(agreements) > 1:
+                    (d0, a0), (d1, a1) = agreements[-2:]
+                    rate = (a1 - a0) / (d1 - d0)
+                    if rate <= 0 or d1 + (digits - a1) / rate > max_depth:
+                        break
+            if depth >= max_depth:
+                break
+            depth = min(2 * depth, max_depth)
+
+        return {
+            depth: Limit(self._to_matrix(product, scalar), self._to_matrix(previous, previous_scalar))
+            for depth, (product, scalar, previous, previous_scalar) in stages.items()
+        }
+
+    @staticmethod
+    def _agreement(first: Tuple[int, int], second: Tuple[int, int]) -> float:
+        """
+        :param first: A convergent p/q as the pair (p, q)
+        :param second: A convergent p/q as the pair (p, q)
+        :return: The number of digits the convergents agree to, relative to max(1, |second|)
+        """
+        (p1, q1), (p2, q2) = first, second
+        if q1 == 0 or q2 == 0:
+            return float('-inf')
+        diff = abs(p1 * q2 - p2 * q1)
+        if diff == 0:
+            return float('inf')
+        digits = mp.log10(abs(q1 * q2)) - mp.log10(diff)
+        if p2 != 0:
+            digits -= max(0, mp.log10(abs(p2)) - mp.log10(abs(q2)))
+        return float(digits)
+
+    def gcd_slope(self, depth: int = 20) -> mp.mpf:
+        """
+        Same as Matrix.gcd_slope(depth) - the slope of a linear fit of log(q_n / gcd(p_n, q_n)) over n < depth,
+        computed from a single walk.
+        :param depth: The maximal value of n
+        :return: The slope of the fit
+        """
+        depths = list(range(1, depth))
+        q_reduced = [float(mp.log(int(limit.as_rational().q))) for limit in self.limit(depths, start=1)]
+        return mp.mpf(np.polyfit(np.array(depths), np.array(q_reduced, dtype=np.float64), 1)[0])
+
+    def screen(self,
+               iterations: int,
+               start: int = 0,
+               trajectory: int = 1,
+               primes: Tuple[int, ...] = SCREEN_PRIMES) -> Optional[str]:
+        """
+        Walk modulo word sized primes to detect degenerate walks without big integers. \n
+        A walk is reported only if it is degenerate modulo all the primes, so a nonzero value divisible by one of them
+        does not reject it (values below the product of the primes are never rejected wrongly).
+        :param iterations: The depth of the walk
+        :param start: The starting point of the walk
+        :param trajectory: The step size of the walk
+        :param primes: The primes to walk modulo
+        :return: None if the walk is regular, else the cause - 'undefined step' if the matrix is undefined at one of
+            the steps, 'zero denominator' if the convergent's denominator vanishes or 'rank drop' if the product has a
+            lower rank than the matrix at a generic point (i.e. one of the steps is singular)
+        """
+        causes = None
+        for p in primes:
+            found = set()
+            xs = (start + trajectory * np.arange(iterations, dtype=np.int64)) % p
+            if not self._horner_mod([self.scalar], xs, p).all():
+                found.add('undefined step')
+            # a CMF can be singular everywhere (e.g. pFq at z = 1), so compare with the rank at a generic point
+            generic = self._horner_mod(self.entries, np.array([self.GENERIC_POINT % p], dtype=np.int64), p)[0]
+            product = self._tree_product_mod(self._horner_mod(self.entries, xs, p), p)
+            if nmod_mat(product.tolist(), p).rank() < nmod_mat(generic.tolist(), p).rank():
+                found.add('rank drop')
+            if product[1, -1] == 0:
+                found.add('zero denominator')
+            causes = found if causes is None else causes & found
+            if not causes:
+                return None
+        return next(cause for cause in ('undefined step', 'zero denominator', 'rank drop') if cause in causes)
+
+    def _horner_mod(self, polys: List[List[int]], xs: np.ndarray, p: int) -> np.ndarray:
+        """
+        Evaluate polynomials at many points modulo p
+        :param polys: The polynomials' coefficients (highest degree first)
+        :param xs: The points (reduced modulo p)
+        :param p: The modulus (below 2^31)
+        :return: For a single polynomial, its values at the points.
+            Otherwise, a (len(xs), dim, dim) array of the step matrices (polys ordered as self.entries).
+        """
+        length = max(len(coeffs) for coeffs in polys)
+        coeffs = np.array([[0] * (length - len(c)) + [int(x) % p for x in c] for c in polys], dtype=np.int64)
+        values = np.zeros((len(polys), len(xs)), dtype=np.int64)
+        for k in range(length):
+            values = (values * xs + coeffs[:, k, None]) % p
+        return values[0] if len(polys) == 1 else values.T.reshape(len(xs), self.dim, self.dim)
+
+    def _tree_product_mod(self, matrices: np.ndarray, p: int) -> np.ndarray:
+        """
+        Multiply a sequence of matrices modulo p, pairing neighbours level by level
+        :param matrices: A (N, dim, dim) array of residues modulo p (below 2^29)
+        :param p: The modulus
+        :return: The product matrices[0] @ ... @ matrices[N - 1] modulo p
+        """
+        identity = np.eye(self.dim, dtype=np.int64)[None, :, :]
+        if len(matrices) == 0:
+            return identity[0]
+        while len(matrices) > 1:
+            if len(matrices) % 2:
+                matrices = np.concatenate([matrices, identity])
+            matrices = (matrices[0::2] @ matrices[1::2]) % p
+        return matrices[0]
+
+    @staticmethod
+    def _float_coefficients(polys: List[List[int]]) -> List[List[float]]:
+        """
+        Convert the integer coefficients of a walker to floats without overflowing. All the polynomials (the entries
+        and the scalar) are divided by the same power of two bringing the largest coefficient to about 1, which leaves
+        the steps unchanged.
+        :param polys: The integer coefficients of each polynomial
+        :return: The scaled coefficients as floats
+        """
+        scale = 1 << max(abs(x).bit_length() for coeffs in polys for x in coeffs)
+        return [[x / scale for x in coeffs] for coeffs in polys]
+
+    @staticmethod
+    def float_screen(walkers: List["CompiledWalker"],
+                     iterations: int,
+                     tolerance: float = 1e-12,
+                     reject_rational: bool = False,
+                     max_denominator: int = 100) -> List[Optional[str]]:
+        """
+        Walk many compiled matrices at once in float64 to reject walks which are obviously useless. \n
+        The steps of all the walkers (of the same dimension) are evaluated together and the products are advanced with
+        one batched matrix multiplication per step, renormalized by their largest entry so they never overflow.
+        The approximate limits p/q at a quarter, half and the full depth are then compared.
+        :param walkers: The walkers to screen (each walks from 0 with step size 1)
+        :param iterations: The depth of the walks
+        :param tolerance: Relative differences below this are considered converged
+        :param reject_rational: Reject walks whose p/q converges to a rational with a small denominator. Note that this
+            does not make the search vector useless - the convergents may still have large denominators, and the
+            identification uses the whole last column (or the inverse walk matrix with LIReC), not only p/q.
+        :param max_denominator: Limits within tolerance from a rational with a denominator up to this are rejected
+        :return: For each walker, None if it passed, else the cause - 'no limit' if the walk overflows or its
+            denominator vanishes, 'no convergence' if the limits do not get closer or 'rational limit'
+        """
+        causes = [None] * len(walkers)
+        for dim in {walker.dim for walker in walkers}:
+            batch = [i for i, walker in enumerate(walkers) if walker.dim == dim]
+            polys = [CompiledWalker._float_coefficients(walkers[i].entries + [walkers[i].scalar]) for i in batch]
+            length = max(len(coeffs) for entries in polys for coeffs in entries)
+            coeffs = np.array([[[0.0] * (length - len(c)) + c for c in entries] for entries in polys])
+            xs = np.arange(iterations, dtype=np.float64)
+            values = np.zeros(coeffs.shape[:2] + (iterations,))
+            for k in range(length):
+                values = values * xs + coeffs[:, :, k, None]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                steps = values[:, :-1] / values[:, -1:]
+                steps = np.moveaxis(steps, -1, 0).reshape(iterations, len(batch), dim, dim)
+
+                product = np.broadcast_to(np.eye(dim), (len(batch), dim, dim)).copy()
+                limits = {}
+                for i in range(iterations):
+                    product = product @ steps[i]
+                    product /= np.abs(product).max(axis=(1, 2), keepdims=True)
+                    if i + 1 in (iterations // 4, iterations // 2, iterations):
+                        limits[i + 1] = product[:, 0, -1] / product[:, 1, -1]
+            quarter, half, full = (limits.get(depth) for depth in (iterations // 4, iterations // 2, iterations))
+
+            for j, i in enumerate(batch):
+                if not np.isfinite(full[j]) or not np.isfinite(half[j]):
+                    causes[i] = 'no limit'
+                    continue
+                scale = max(1.0, abs(full[j]))
+                late, early = abs(full[j] - half[j]), abs(half[j] - quarter[j]) if quarter is not None else np.inf
+                if late > tolerance * scale and not late < early:
+                    causes[i] = 'no convergence'
+                elif reject_rational and late <= tolerance * scale:
+                    rational = Fraction(float(full[j])).limit_denominator(max_denominator)
+                    if abs(full[j] - rational) <= tolerance * scale:
+                        causes[i] = 'rational limit'
+        return causes